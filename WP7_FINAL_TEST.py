@@ -6,15 +6,16 @@ Tests all implemented features including the new create_account feature
 """
 
 import requests
-import json
 import sys
 import os
 
+from _net import API_BASE
+
 # Set encoding for Windows
 if sys.platform.startswith('win'):
     os.environ['PYTHONIOENCODING'] = 'utf-8'
 
-base_url = "http://localhost:8000"
+base_url = API_BASE
 
 print("=" * 90)
 print(" " * 20 + "WP7 FINAL COMPREHENSIVE TEST SUITE")
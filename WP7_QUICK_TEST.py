@@ -7,7 +7,9 @@ WP7 QUICK TEST - Validates core functionality
 import requests
 import sys
 
-base_url = "http://localhost:8000"
+from _net import API_BASE
+
+base_url = API_BASE
 
 print("=" * 80)
 print("WP7 QUICK TEST - Core Features Validation")
@@ -0,0 +1,78 @@
+"""
+Shared SQLite access for the diagnostic scripts
+One connection per process, with prepared statements reused across calls
+
+Uses apsw when installed, so cached statements can be prepared as
+persistent; otherwise falls back to the stdlib sqlite3 module.
+"""
+import os
+import sqlite3
+
+try:
+    import apsw
+except ImportError:
+    apsw = None
+
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'bank_demo.db')
+
+# Number of prepared statements sqlite3 keeps per connection (LRU, keyed by SQL text)
+STATEMENT_CACHE_SIZE = 64
+
+# Applied to every new connection: WAL so reads don't block on the backend's
+# writes, fewer fsyncs, a 64 MB page cache and 256 MB of memory-mapped I/O
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL;"
+    "PRAGMA synchronous=NORMAL;"
+    "PRAGMA temp_store=MEMORY;"
+    "PRAGMA cache_size=-65536;"
+    "PRAGMA mmap_size=268435456;"
+    "PRAGMA busy_timeout=5000;"
+)
+
+_conn = None
+
+
+def get_conn():
+    """Return the process-wide connection, opening it on first use"""
+    global _conn
+    if _conn is None:
+        if apsw is not None:
+            _conn = apsw.Connection(DB_PATH, statementcachesize=STATEMENT_CACHE_SIZE)
+        else:
+            _conn = sqlite3.connect(
+                DB_PATH,
+                isolation_level=None,
+                check_same_thread=False,
+                cached_statements=STATEMENT_CACHE_SIZE,
+            )
+        _executescript(_conn, CONNECTION_PRAGMAS)
+    return _conn
+
+
+def _executescript(conn, script):
+    """Run several statements, discarding any rows they return"""
+    if apsw is None:
+        conn.executescript(script)
+    else:
+        # apsw pauses at each statement that returns rows (e.g. journal_mode)
+        for _ in conn.execute(script, can_cache=False):
+            pass
+
+
+def run_cached(sql, params=()):
+    """Execute a query, reusing its prepared statement if it ran before"""
+    conn = get_conn()
+    if apsw is None:
+        return conn.execute(sql, params)
+    # Cached statements live for the whole run, so tell SQLite to allocate
+    # them off the lookaside pool and leave that for transient statements
+    return conn.cursor().execute(sql, params,
+                                 prepare_flags=apsw.SQLITE_PREPARE_PERSISTENT)
+
+
+def close_conn():
+    """Close the shared connection if it is open"""
+    global _conn
+    if _conn is not None:
+        _conn.close()
+        _conn = None
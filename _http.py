@@ -0,0 +1,167 @@
+"""
+Shared pooled HTTP session for the chatbot test scripts
+Keeps one keep-alive connection pool to the local API server per process,
+and builds chat request bodies as pre-serialized JSON (orjson when installed)
+
+With TEST_REPLAY=1, post_chat() replays recorded responses for chat turns
+it has seen before (keyed by the conversation so far, OTP codes excluded)
+and saves new ones to TEST_REPLAY_FILE when the process exits; running a
+script with --no-cache skips the lookups but still refreshes the file
+"""
+import atexit
+import functools
+import json
+import os
+import re
+import sys
+import uuid
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from _net import API_BASE
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import h2
+except ImportError:
+    h2 = None
+
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=0))
+SESSION.headers["Connection"] = "keep-alive"
+atexit.register(SESSION.close)
+
+# Headers for posting a pre-serialized body
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# httpx only negotiates HTTP/2 over TLS; plain http stays on HTTP/1.1
+HTTP2 = h2 is not None and API_BASE.startswith("https://")
+
+
+def dumps(obj) -> bytes:
+    """Serialize to compact JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def loads(data):
+    """Parse JSON from response bytes"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def pretty(obj) -> str:
+    """Indented JSON for printing"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
+
+
+def async_client(timeout=10.0, **limits):
+    """
+    Pooled httpx.AsyncClient for the concurrent test scripts
+    
+    Concurrent sessions share one multiplexed HTTP/2 connection when HTTP2
+    is set, and a keep-alive HTTP/1.1 pool otherwise. `limits` overrides
+    the httpx.Limits defaults below.
+    """
+    import httpx
+    
+    limits = httpx.Limits(**{"max_connections": 50, "max_keepalive_connections": 20, **limits})
+    return httpx.AsyncClient(http2=HTTP2, limits=limits, timeout=timeout)
+
+
+@functools.lru_cache(maxsize=256)
+def chat_body(message, session_id, user_id=1) -> bytes:
+    """JSON body for /api/chat, serialized once per (message, session_id, user_id)"""
+    return dumps({"message": message, "user_id": user_id, "session_id": session_id})
+
+
+REPLAY = os.getenv("TEST_REPLAY") == "1"
+REPLAY_FILE = os.getenv("TEST_REPLAY_FILE", ".pytest_replay.json")
+REPLAY_REFRESH = "--no-cache" in sys.argv
+
+# OTP codes change on every run, so those turns always go to the server
+_OTP_RE = re.compile(r"^\d{6}$")
+
+_replay_cache = {}  # conversation key -> recorded response
+_history = {}       # session_id -> messages sent in that session so far
+_aliases = {}       # replay handle -> (live session id, turns it has seen)
+
+
+def _load_replay():
+    try:
+        with open(REPLAY_FILE, "rb") as f:
+            _replay_cache.update(loads(f.read()))
+    except (OSError, ValueError):
+        pass
+
+
+def _save_replay():
+    """Merge this process's recordings into the replay file"""
+    merged = {}
+    try:
+        with open(REPLAY_FILE, "rb") as f:
+            merged.update(loads(f.read()))
+    except (OSError, ValueError):
+        pass
+    merged.update(_replay_cache)
+    tmp = f"{REPLAY_FILE}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(dumps(merged))
+    os.replace(tmp, REPLAY_FILE)
+
+
+if REPLAY:
+    _load_replay()
+    atexit.register(_save_replay)
+
+
+def _post_live(session, url, message, session_id, user_id, timeout):
+    response = session.post(url, data=chat_body(message, session_id, user_id),
+                            headers=JSON_HEADERS, timeout=timeout)
+    response.raise_for_status()
+    return loads(response.content)
+
+
+def post_chat(session, url, message, session_id="", user_id=1, timeout=10) -> dict:
+    """
+    Send one chat turn and return the decoded response
+    
+    Under TEST_REPLAY=1 a turn already recorded for the same conversation
+    prefix is answered from the replay file, under a "replay-" session
+    handle. When a later turn in that conversation misses, the replayed
+    turns are first re-sent to the server to get a real session, and the
+    rest of the conversation stays live.
+    """
+    session_id = session_id or ""
+    history = _history.get(session_id, ())
+    key = "\x1f".join((str(user_id),) + history + (message,))
+    cacheable = REPLAY and not _OTP_RE.match(message.strip())
+    replayed = session_id.startswith("replay-")
+    
+    if cacheable and not REPLAY_REFRESH and key in _replay_cache and (replayed or not session_id):
+        handle = session_id or f"replay-{uuid.uuid4().hex}"
+        data = dict(_replay_cache[key], session_id=handle)
+    else:
+        live_id = session_id
+        if replayed:
+            live_id, synced = _aliases.get(session_id, ("", 0))
+            for earlier in history[synced:]:
+                live_id = _post_live(session, url, earlier, live_id, user_id, timeout).get("session_id", live_id)
+        data = _post_live(session, url, message, live_id, user_id, timeout)
+        if cacheable:
+            _replay_cache[key] = data
+        if replayed:
+            _aliases[session_id] = (data.get("session_id", live_id), len(history) + 1)
+            data = dict(data, session_id=session_id)
+    
+    _history[data.get("session_id") or session_id] = history + (message,)
+    return data
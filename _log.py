@@ -0,0 +1,31 @@
+"""
+Shared logger for the test scripts
+Progress output (banners, step headers, bot replies) goes through
+log.info, results through log.warning and failures through log.error, so
+one switch picks the stream: TEST_LOG=WARNING keeps only the results and
+skips formatting the progress lines' arguments
+"""
+import logging
+import os
+import sys
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """Writes to the current sys.stdout, so pytest's capture still sees it"""
+    
+    @property
+    def stream(self):
+        return sys.stdout
+    
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+log = logging.getLogger("tests")
+if not log.handlers:
+    _handler = _StdoutHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    log.addHandler(_handler)
+    log.setLevel(os.getenv("TEST_LOG", "INFO").upper())
+    log.propagate = False
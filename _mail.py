@@ -0,0 +1,111 @@
+"""
+Mailbox helper for the OTP test scripts
+Waits for the backend's verification email over IMAP, using IDLE when the
+server supports it, and pulls the 6-digit code out of it. Configured with
+TEST_IMAP_HOST, TEST_IMAP_USER, TEST_IMAP_PASSWORD and optionally
+TEST_OTP_SENDER
+"""
+import email
+import email.utils
+import imaplib
+import os
+import re
+import select
+import time
+
+IMAP_HOST = os.getenv("TEST_IMAP_HOST", "imap.gmail.com")
+IMAP_USER = os.getenv("TEST_IMAP_USER")
+IMAP_PASSWORD = os.getenv("TEST_IMAP_PASSWORD")
+OTP_SENDER = os.getenv("TEST_OTP_SENDER")
+
+# Subject shared by EmailService's verification emails
+OTP_SUBJECT = "Verification Code"
+
+# Mail Date headers have one-second resolution and the clocks may differ
+CLOCK_SLACK_SECONDS = 5
+
+_CODE_RE = re.compile(rb'code is:\s*(\d{6})', re.I)
+_OTP_RE = re.compile(rb'\b(\d{6})\b')
+_IDLE_TAG = b"OTPIDLE"
+
+
+def imap_configured() -> bool:
+    """True when mailbox credentials are set"""
+    return bool(IMAP_USER and IMAP_PASSWORD)
+
+
+def _search_criteria() -> str:
+    parts = ["UNSEEN", f'SUBJECT "{OTP_SUBJECT}"']
+    if OTP_SENDER:
+        parts.append(f'FROM "{OTP_SENDER}"')
+    return f"({' '.join(parts)})"
+
+
+def _latest_otp(imap, since):
+    """Return the code from the newest unseen verification mail sent after `since`"""
+    _, data = imap.search(None, _search_criteria())
+    ids = data[0].split()
+    if not ids:
+        return None
+    _, msg_data = imap.fetch(ids[-1], "(BODY.PEEK[])")
+    msg = email.message_from_bytes(msg_data[0][1])
+    sent = email.utils.parsedate_to_datetime(msg["Date"]) if msg["Date"] else None
+    if sent is not None and sent.timestamp() < since - CLOCK_SLACK_SECONDS:
+        return None
+    for part in msg.walk():
+        if part.get_content_type() != "text/plain":
+            continue
+        payload = part.get_payload(decode=True) or b""
+        match = _CODE_RE.search(payload) or _OTP_RE.search(payload)
+        if match:
+            return match.group(1).decode()
+    return None
+
+
+def _idle(imap, timeout) -> bool:
+    """
+    Block in IMAP IDLE until the mailbox changes or `timeout` seconds pass
+    
+    Returns False if the server refused IDLE.
+    """
+    imap.send(_IDLE_TAG + b" IDLE\r\n")
+    if not imap.readline().startswith(b"+"):
+        return False
+    
+    # select() instead of a socket timeout: a timed-out read would leave
+    # imaplib's buffered reader unusable
+    pending = getattr(imap.sock, "pending", lambda: 0)
+    ready, _, _ = select.select([imap.sock], [], [], 0 if pending() else timeout)
+    if ready:
+        imap.readline()  # untagged "* n EXISTS" when mail lands
+    
+    imap.send(b"DONE\r\n")
+    while True:
+        line = imap.readline()
+        if not line or line.startswith(_IDLE_TAG):
+            break
+    return True
+
+
+def wait_for_otp(since: float, timeout: float = 30.0):
+    """
+    Wait for the verification email sent after `since` (epoch seconds)
+    
+    Returns the 6-digit code, or None on timeout or if the mailbox
+    can't be reached.
+    """
+    deadline = time.monotonic() + timeout
+    try:
+        with imaplib.IMAP4_SSL(IMAP_HOST) as imap:
+            imap.login(IMAP_USER, IMAP_PASSWORD)
+            imap.select("INBOX", readonly=True)
+            while True:
+                otp = _latest_otp(imap, since)
+                remaining = deadline - time.monotonic()
+                if otp or remaining <= 0:
+                    return otp
+                if not _idle(imap, remaining):
+                    time.sleep(min(1.0, remaining))  # no IDLE support, poll instead
+    except (imaplib.IMAP4.error, OSError) as e:
+        print(f"    [WARNING] Mailbox check failed: {e}")
+        return None
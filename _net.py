@@ -0,0 +1,30 @@
+"""
+Shared socket helpers for the launcher and test scripts
+"""
+import os
+import socket
+import time
+from urllib.parse import urlsplit
+
+# Base URL of the chat API. An IP literal skips the getaddrinfo lookup, and
+# the IPv6-then-IPv4 retry that "localhost" can cost on each new connection
+API_BASE = os.getenv("BANK_API", "http://127.0.0.1:8000")
+API_HOST = urlsplit(API_BASE).hostname
+API_PORT = urlsplit(API_BASE).port or 80
+
+
+def is_port_open(host, port, timeout=1):
+    """Check if a port is open"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        return sock.connect_ex((host, port)) == 0
+
+
+def wait_for_port(host, port, timeout=30, interval=0.05):
+    """Poll until a port accepts connections; returns False after timeout seconds"""
+    deadline = time.monotonic() + timeout
+    while not is_port_open(host, port):
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(interval)
+    return True
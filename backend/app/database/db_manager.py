@@ -3,19 +3,75 @@ Database Manager
 Handles database connections and operations
 """
 
+import itertools
 import sqlite3
 import os
+import random
+import threading
+import time
 from typing import Optional, List, Dict, Any, Tuple
 from contextlib import contextmanager
 from datetime import datetime
 import json
 
 
+# Per-connection settings: wait up to 5s on a locked database instead of
+# failing with SQLITE_BUSY, fewer fsyncs (safe under WAL), and a 32 MB page
+# cache with temp tables kept in memory
+CONNECTION_PRAGMAS = (
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-32000",
+    "PRAGMA temp_store=MEMORY",
+)
+
+# Trigram full-text index over users(name, email) for substring search,
+# backfilled once and kept in step with the users table by triggers
+USERS_FTS_SCHEMA = """
+BEGIN;
+CREATE VIRTUAL TABLE users_fts USING fts5(
+    name, email, content='users', content_rowid='id', tokenize='trigram'
+);
+INSERT INTO users_fts(users_fts) VALUES ('rebuild');
+CREATE TRIGGER users_fts_ai AFTER INSERT ON users BEGIN
+    INSERT INTO users_fts(rowid, name, email) VALUES (new.id, new.name, new.email);
+END;
+CREATE TRIGGER users_fts_ad AFTER DELETE ON users BEGIN
+    INSERT INTO users_fts(users_fts, rowid, name, email)
+    VALUES ('delete', old.id, old.name, old.email);
+END;
+CREATE TRIGGER users_fts_au AFTER UPDATE OF name, email ON users BEGIN
+    INSERT INTO users_fts(users_fts, rowid, name, email)
+    VALUES ('delete', old.id, old.name, old.email);
+    INSERT INTO users_fts(rowid, name, email) VALUES (new.id, new.name, new.email);
+END;
+COMMIT;
+"""
+
+
+class _TransactionConnection:
+    """
+    Connection handed to operations running inside DatabaseManager.transaction()
+    Commits are left to the enclosing transaction
+    """
+    
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+    
+    def commit(self):
+        """No-op: the enclosing transaction commits once on exit"""
+    
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
 class DatabaseManager:
     """
     Manages SQLite database connections and operations
     """
     
+    ACCOUNT_TYPES = ('savings', 'current', 'salary')
+    
     def __init__(self, db_path: str = 'data/bank_demo.db'):
         """
         Initialize database manager
@@ -25,6 +81,14 @@ class DatabaseManager:
         """
         self.db_path = db_path
         
+        # Connection of the transaction() block active on each thread, if any
+        self._local = threading.local()
+        
+        # Changes after every write to balances, accounts or bills; see
+        # data_version()
+        self._data_versions = itertools.count(1)
+        self._data_version = 0
+        
         # Ensure data directory exists
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
         
@@ -35,19 +99,66 @@ class DatabaseManager:
         else:
             print(f"[DB] Using existing database at {db_path}")
         
+        # WAL lets readers proceed while a write is in progress; the mode is
+        # stored in the database file, so setting it once is enough
+        with self.get_connection() as conn:
+            journal_mode = conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+        if journal_mode.lower() != 'wal':
+            print(f"[DB] Warning: journal_mode is {journal_mode}, not WAL")
+        
         # Initialize auth tables
         self.initialize_auth_tables()
+        
+        # Index users for name/email search
+        self.initialize_users_fts()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection configured for this database"""
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row  # Return rows as dictionaries
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
+    @staticmethod
+    @contextmanager
+    def _savepoint(conn):
+        """
+        Undo the block's writes if it raises, keeping the enclosing
+        transaction open
+        
+        Savepoints nest, so one name serves every level: ROLLBACK TO and
+        RELEASE act on the innermost savepoint with that name.
+        """
+        conn.execute("SAVEPOINT db_operation")
+        try:
+            yield
+        except Exception:
+            conn.execute("ROLLBACK TO db_operation")
+            conn.execute("RELEASE db_operation")
+            raise
+        conn.execute("RELEASE db_operation")
     
     @contextmanager
     def get_connection(self):
         """
         Context manager for database connections
         
+        Inside a transaction() block this yields the transaction's
+        connection instead of opening a new one, under a savepoint: if the
+        operation raises, its writes are undone even when the caller catches
+        the error and the enclosing transaction goes on to commit.
+        
         Yields:
             sqlite3.Connection: Database connection
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Return rows as dictionaries
+        txn_conn = getattr(self._local, 'conn', None)
+        if txn_conn is not None:
+            with self._savepoint(txn_conn):
+                yield txn_conn
+            return
+        
+        conn = self._connect()
         try:
             yield conn
             conn.commit()
@@ -57,6 +168,56 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    @contextmanager
+    def transaction(self):
+        """
+        Run several operations as one write transaction
+        
+        Every DatabaseManager call made on this thread inside the block
+        shares one connection under BEGIN IMMEDIATE, committed once on exit
+        and rolled back if the block raises.
+        
+        Yields:
+            sqlite3.Connection: The transaction's connection
+        """
+        if getattr(self._local, 'conn', None) is not None:
+            # Already inside a transaction: nest under a savepoint
+            with self._savepoint(self._local.conn):
+                yield self._local.conn
+            return
+        
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        self._local.conn = _TransactionConnection(conn)
+        try:
+            yield self._local.conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._local.conn = None
+            conn.close()
+            # Reads made while the block ran may have seen its uncommitted
+            # (or rolled back) writes
+            self._bump_data_version()
+    
+    def data_version(self) -> int:
+        """
+        Counter that changes whenever balances, accounts or bills change
+        
+        Callers that cache data derived from those tables compare it with
+        the value they saw when they stored the entry.
+        
+        Returns:
+            Current data version
+        """
+        return self._data_version
+    
+    def _bump_data_version(self):
+        """Record a write to balances, accounts or bills"""
+        self._data_version = next(self._data_versions)
+    
     def _initialize_database(self):
         """Initialize database with schema"""
         # Try multiple possible paths for schema.sql
@@ -576,6 +737,7 @@ class DatabaseManager:
             WHERE account_no = ?
         """
         rows_affected = self.execute_update(query, (new_balance, account_no))
+        self._bump_data_version()
         return rows_affected > 0
     
     def create_account(self, user_id: int, account_type: str, 
@@ -597,15 +759,11 @@ class DatabaseManager:
             return False, "User not found", None
         
         # Validate account type
-        valid_types = ['savings', 'current', 'salary']
-        if account_type not in valid_types:
-            return False, f"Invalid account type. Must be one of: {', '.join(valid_types)}", None
+        if account_type not in self.ACCOUNT_TYPES:
+            return False, f"Invalid account type. Must be one of: {', '.join(self.ACCOUNT_TYPES)}", None
         
         # Generate unique account number
-        import uuid
-        import random
-        timestamp = int(__import__('time').time() * 1000) % 1000000
-        account_no = f"PK{user_id:02d}{account_type[:3].upper()}{timestamp}{random.randint(1000, 9999)}"
+        account_no = self._new_account_no(user_id, account_type)
         
         try:
             query = """
@@ -614,11 +772,61 @@ class DatabaseManager:
             """
             with self.get_connection() as conn:
                 conn.execute(query, (user_id, account_no, account_type, initial_balance))
+            self._bump_data_version()
             
             return True, f"{account_type.capitalize()} account created successfully", account_no
         except Exception as e:
             return False, f"Failed to create account: {str(e)}", None
     
+    def create_accounts_bulk(self, user_id: int, accounts: List[Dict]) -> Tuple[bool, str, List[str]]:
+        """
+        Create several accounts for a user with one executemany
+        
+        Args:
+            user_id: ID of the user
+            accounts: List of dicts with 'type' and optional 'balance'
+            
+        Returns:
+            Tuple of (success, message, account_numbers) with numbers in input order
+        """
+        user = self.get_user_by_id(user_id)
+        if not user:
+            return False, "User not found", []
+        
+        for acc in accounts:
+            if acc['type'] not in self.ACCOUNT_TYPES:
+                return False, f"Invalid account type. Must be one of: {', '.join(self.ACCOUNT_TYPES)}", []
+        
+        account_numbers = []
+        for acc in accounts:
+            account_no = self._new_account_no(user_id, acc['type'])
+            while account_no in account_numbers:
+                account_no = self._new_account_no(user_id, acc['type'])
+            account_numbers.append(account_no)
+        
+        try:
+            query = """
+                INSERT INTO accounts (user_id, account_no, account_type, balance, status)
+                VALUES (?, ?, ?, ?, 'active')
+            """
+            rows = [
+                (user_id, account_no, acc['type'], acc.get('balance', 0.0))
+                for account_no, acc in zip(account_numbers, accounts)
+            ]
+            with self.get_connection() as conn:
+                conn.executemany(query, rows)
+            self._bump_data_version()
+            
+            return True, f"{len(rows)} accounts created successfully", account_numbers
+        except Exception as e:
+            return False, f"Failed to create accounts: {str(e)}", []
+    
+    @staticmethod
+    def _new_account_no(user_id: int, account_type: str) -> str:
+        """Generate an account number like PK01SAV1234565678"""
+        timestamp = int(time.time() * 1000) % 1000000
+        return f"PK{user_id:02d}{account_type[:3].upper()}{timestamp}{random.randint(1000, 9999)}"
+    
     # ========== TRANSACTION OPERATIONS ==========
     
     def record_transaction(self, account_id: int, txn_type: str, 
@@ -666,6 +874,33 @@ class DatabaseManager:
         """
         return self.execute_query(query, (account_id, limit))
     
+    def get_history_for_user(self, user_id: int, limit: int = 10) -> List[Dict]:
+        """
+        Get transaction history for a user's primary account in one query
+        
+        The primary account is the first active account in the order
+        returned by get_user_accounts.
+        
+        Args:
+            user_id: User ID
+            limit: Maximum number of transactions
+            
+        Returns:
+            List of transactions, newest first
+        """
+        query = """
+            SELECT t.* FROM transactions t
+            WHERE t.account_id = (
+                SELECT a.id FROM accounts a
+                WHERE a.user_id = ? AND a.status = 'active'
+                ORDER BY a.account_type
+                LIMIT 1
+            )
+            ORDER BY t.timestamp DESC
+            LIMIT ?
+        """
+        return self.execute_query(query, (user_id, limit))
+    
     def get_recent_transactions_by_account_no(self, account_no: str, limit: int = 10) -> List[Dict]:
         """Get recent transactions by account number"""
         query = """
@@ -742,6 +977,7 @@ class DatabaseManager:
                       description, new_to_balance))
                 
                 conn.commit()
+            self._bump_data_version()
             
             return True, f"Successfully transferred PKR {amount:,.2f}"
             
@@ -826,6 +1062,7 @@ class DatabaseManager:
                     """, (bill['id'],))
                 
                 conn.commit()
+            self._bump_data_version()
             
             return True, f"Successfully paid {bill_type} bill of PKR {amount:,.2f}"
             
@@ -891,6 +1128,33 @@ class DatabaseManager:
             self._create_auth_tables_inline()
             return True
     
+    def initialize_users_fts(self) -> bool:
+        """
+        Create the users_fts trigram index used for name/email search
+        
+        Needs SQLite built with FTS5 and its trigram tokenizer (3.34+).
+        Without them no index is created and searches fall back to LIKE.
+        
+        Returns:
+            True if the index exists
+        """
+        with self.get_connection() as conn:
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users_fts'"
+            ).fetchone()
+        if exists:
+            return True
+        
+        try:
+            with self.get_connection() as conn:
+                conn.executescript(USERS_FTS_SCHEMA)
+        except sqlite3.OperationalError as e:
+            print(f"[WARN] users_fts index not created ({e}); user search will use LIKE")
+            return False
+        
+        print("[OK] users_fts index created")
+        return True
+    
     def _create_auth_tables_inline(self):
         """Create auth tables directly (fallback)"""
         with self.get_connection() as conn:
@@ -6,7 +6,7 @@ Bank Teller Chatbot REST API
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List
 import os
 import sys
@@ -90,6 +90,9 @@ error_recovery: Optional[ErrorRecovery] = None
 # ===== Phase 4: Enhanced Entity Extractor Instance =====
 enhanced_entity_extractor: Optional[EnhancedBankingEntityExtractor] = None
 
+# Set once a dummy prediction has run through the loaded models
+models_warm: bool = False
+
 
 # ========== STARTUP & SHUTDOWN ==========
 
@@ -100,7 +103,7 @@ async def startup_event():
     global dialogue_manager, session_manager, response_generator, auth_manager
     global entity_validator, receipt_generator, error_handler
     global request_validator, rate_limiter, transaction_manager, error_recovery
-    global enhanced_entity_extractor
+    global enhanced_entity_extractor, models_warm
     
     logger.info("Starting Bank Teller Chatbot API...")
     
@@ -204,6 +207,19 @@ async def startup_event():
         error_recovery = ErrorRecovery()
         logger.info("Error recovery initialized")
         
+        # Run one message through the models so the first chat request
+        # doesn't pay for graph tracing and lazy initialization
+        logger.info("Warming up intent classifier and entity extractors...")
+        try:
+            warm_message = "transfer 500 to account 1234"
+            prediction = intent_classifier.predict(warm_message)
+            entity_extractor.extract_and_validate(warm_message)
+            enhanced_entity_extractor.extract_context_aware_entities(warm_message, intent=prediction['intent'])
+            models_warm = True
+            logger.info("Warmup complete")
+        except Exception as e:
+            logger.warning(f"Warmup failed, first request will be slower: {e}")
+        
         logger.info("All components loaded successfully!")
         
     except Exception as e:
@@ -217,10 +233,17 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("Shutting down Bank Teller Chatbot API...")
+    if session_manager is not None:
+        session_manager.shutdown(timeout=5)
 
 
 # ========== REQUEST/RESPONSE MODELS ==========
 
+# Most messages one /api/chat/batch request may carry; each runs the full
+# chat pipeline, so an unbounded list could tie up the server
+CHAT_BATCH_MAX_MESSAGES = 20
+
+
 class ChatRequest(BaseModel):
     """Chat message request"""
     message: str
@@ -228,6 +251,14 @@ class ChatRequest(BaseModel):
     session_id: Optional[str] = None
 
 
+class ChatBatchRequest(BaseModel):
+    """Several chat messages sent in order within one session"""
+    messages: List[str] = Field(..., max_length=CHAT_BATCH_MAX_MESSAGES)
+    user_id: int = 1  # Default user
+    session_id: Optional[str] = None
+    independent: bool = False  # Fresh session per message, no early stop
+
+
 class ChatResponse(BaseModel):
     """Chat message response"""
     response: str
@@ -355,7 +386,8 @@ async def health_check():
         "database": db_manager is not None,
         "intent_classifier": intent_classifier is not None,
         "entity_extractor": entity_extractor is not None,
-        "dialogue_manager": dialogue_manager is not None
+        "dialogue_manager": dialogue_manager is not None,
+        "warm": models_warm
     }
 
 
@@ -437,6 +469,8 @@ async def chat(request: ChatRequest):
     """
     session_found = False
     idempotency_key = str(uuid.uuid4())
+    if response_generator is not None:
+        response_generator.begin_turn()
     
     try:
         # ============ LAYER 1: INPUT VALIDATION & RATE LIMITING ============
@@ -1654,6 +1688,44 @@ async def execute_action(state: DialogueState, user_id: int) -> Optional[str]:
         return f"Action failed: {str(e)}"
 
 
+@app.post("/api/chat/batch")
+async def chat_batch(request: ChatBatchRequest):
+    """
+    Run a fixed sequence of chat messages in one session with one request
+    
+    Each message goes through the /api/chat pipeline in order, continuing
+    the session created or resumed by the first one. Processing stops after
+    the first response with status "error", including a message that fails
+    with an internal error. Conversations that branch on a reply should keep
+    using /api/chat. At most CHAT_BATCH_MAX_MESSAGES messages are accepted
+    per request (422 otherwise, with the cap in the error's ctx.max_length).
+    
+    With "independent" set, every message starts its own session and all of
+    them are answered, so unrelated one-shot messages can share a request.
+    """
+    session_id = request.session_id
+    responses = []
+    for message in request.messages:
+        try:
+            result = await chat(ChatRequest(
+                message=message,
+                user_id=request.user_id,
+                session_id=None if request.independent else session_id
+            ))
+            data = json.loads(result.body)
+        except HTTPException as e:
+            # Report the failed message in place, keeping earlier answers
+            data = {"response": e.detail, "session_id": None, "status": "error"}
+        responses.append(data)
+        if request.independent:
+            continue
+        if data.get("status") == "error":
+            break
+        session_id = data.get("session_id") or session_id
+    
+    return {"session_id": session_id, "responses": responses}
+
+
 # ========== BANKING ENDPOINTS ==========
 
 @app.get("/api/balance/{user_id}")
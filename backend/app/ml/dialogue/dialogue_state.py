@@ -24,6 +24,17 @@ class DialogueState:
     Tracks intent, entities, required slots, and conversation flow
     """
     
+    # Fixed attribute layout: no per-instance __dict__ for long-lived sessions
+    __slots__ = (
+        'user_id', 'session_id',
+        'intent', 'intent_confidence',
+        'entities', 'required_slots', 'filled_slots', 'missing_slots',
+        'status', 'turn_count', 'max_turns',
+        'confirmation_pending', 'pending_action',
+        'context', 'conversation_history',
+        'created_at', 'last_updated',
+    )
+    
     def __init__(self, user_id: int, session_id: str):
         """
         Initialize dialogue state
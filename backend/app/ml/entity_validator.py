@@ -7,11 +7,32 @@ import re
 from typing import Optional, Any
 
 
+# Letters, spaces, hyphens and dots
+NAME_PATTERN = re.compile(r'^[A-Za-z\s\-\.]+$')
+
+
 class EntityValidator:
     """
     Validates banking entities according to business rules
     """
     
+    # Entity kind -> validator method, for validate_batch()
+    BATCH_VALIDATORS = {
+        'amount': 'validate_amount',
+        'account_number': 'validate_account_number',
+        'phone_number': 'validate_phone_number',
+        'person': 'validate_person_name',
+        'bill_type': 'validate_bill_type',
+        'date': 'validate_date',
+    }
+    
+    # Account number patterns
+    IBAN_PATTERN = re.compile(r'^PK\d{2}[A-Z]{4}\d{16}$')
+    ACCOUNT_PATTERN = re.compile(r'^\d{12,16}$')
+    
+    # Phone number pattern (Pakistani format)
+    PHONE_PATTERN = re.compile(r'^03\d{9}$')
+    
     def __init__(self):
         """Initialize validator with business rules"""
         
@@ -24,13 +45,6 @@ class EntityValidator:
             'electricity', 'mobile', 'gas', 'water', 
             'internet', 'credit_card', 'loan'
         ]
-        
-        # Account number patterns
-        self.IBAN_PATTERN = re.compile(r'^PK\d{2}[A-Z]{4}\d{16}$')
-        self.ACCOUNT_PATTERN = re.compile(r'^\d{12,16}$')
-        
-        # Phone number pattern (Pakistani format)
-        self.PHONE_PATTERN = re.compile(r'^03\d{9}$')
     
     def validate_amount(self, amount: Any) -> Optional[float]:
         """
@@ -138,7 +152,7 @@ class EntityValidator:
             return None
         
         # Check for valid characters (letters, spaces, hyphens)
-        if not re.match(r'^[A-Za-z\s\-\.]+$', name):
+        if not NAME_PATTERN.match(name):
             print(f"⚠️  Invalid characters in name: {name}")
             return None
         
@@ -184,6 +198,23 @@ class EntityValidator:
         # using datetime library
         return date_str.strip()
     
+    def validate_batch(self, kind: str, items: list) -> list:
+        """
+        Validate several values of one entity kind
+        
+        Args:
+            kind: Entity kind, a key of BATCH_VALIDATORS
+            items: Values to validate
+            
+        Returns:
+            Validated values in input order, None where invalid
+        """
+        if kind not in self.BATCH_VALIDATORS:
+            raise ValueError(f"Unknown entity kind: {kind}")
+        
+        validate = getattr(self, self.BATCH_VALIDATORS[kind])
+        return [validate(item) for item in items]
+    
     def validate_entities(self, entities: dict) -> dict:
         """
         Validate all entities in a dictionary
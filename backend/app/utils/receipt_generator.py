@@ -5,8 +5,162 @@ Place in: backend/app/utils/receipt_generator.py
 """
 
 from datetime import datetime
-from typing import Dict, Any, Optional
+from functools import lru_cache
+from typing import Dict, Any, List, Optional
 import json
+import sys
+import time
+
+
+# Values repeated in every receipt, interned once at import time
+_CURRENCY = sys.intern("PKR")
+_TYPE_TRANSFER = sys.intern("transfer")
+_TYPE_BILL_PAYMENT = sys.intern("bill_payment")
+_TYPE_ACCOUNT_CREATION = sys.intern("account_creation")
+_STATUS_OK = sys.intern("success")
+_STATUS_ACTIVE = sys.intern("active")
+_INITIATED = sys.intern("chatbot")
+
+# Display names for the known account types; anything else is title-cased
+_ACCOUNT_TYPE_TITLED = {
+    'salary': 'Salary',
+    'savings': 'Savings',
+    'current': 'Current',
+    'checking': 'Checking',
+    'business': 'Business',
+    'N/A': 'N/A',
+}
+
+# Top-level field order of each JSON receipt
+_RECEIPT_KEYS = ("transaction_id", "timestamp", "type", "status",
+                 "from", "to", "amounts", "metadata")
+_BILL_RECEIPT_KEYS = ("transaction_id", "timestamp", "type", "status",
+                      "bill", "payment_account", "amounts")
+_ACCOUNT_RECEIPT_KEYS = ("registration_id", "timestamp", "type", "status",
+                         "account_holder", "account")
+
+def _title_account_type(account_type: str) -> str:
+    """Display name for an account type (e.g. savings -> Savings)"""
+    return _ACCOUNT_TYPE_TITLED.get(account_type) or account_type.title()
+
+
+@lru_cache(maxsize=1024)
+def _mask(account_number: str) -> str:
+    """Cached body of ReceiptGenerator._mask_account"""
+    if not account_number or len(account_number) < 8:
+        return account_number
+    
+    return f"{account_number[:4]}****{account_number[-4:]}"
+
+
+def _encode_receipt(keys, values) -> str:
+    """Serialize receipt fields under a top-level "receipt" key"""
+    return json.dumps({"receipt": dict(zip(keys, values))}, indent=2)
+
+# Receipt separator line, shared by every text template below
+_SEP = "━" * 34
+
+# Text receipt templates, built once at import time. Optional sections
+# (reference, new balance) are kept as separate fragments.
+_TRANSFER_TPL = f"""
+{_SEP}
+       TRANSACTION RECEIPT
+{_SEP}
+Transaction ID: {{transaction_id}}
+Date: {{date}}
+Type: Money Transfer
+
+FROM
+├─ Account: {{from_masked}} ({{from_type}})
+├─ Name: {{from_name}}
+└─ Previous Balance: {{currency}} {{previous_balance:,.2f}}
+
+TO
+├─ Account: {{to_masked}}
+└─ Name: {{to_name}}
+"""
+
+_TRANSFER_DETAILS_TPL = """
+TRANSACTION DETAILS
+├─ Amount: {currency} {amount:,.2f}
+├─ Fee: {currency} 0.00
+├─ Total Deducted: {currency} {amount:,.2f}
+└─ Status: ✅ SUCCESS
+"""
+
+_TRANSFER_BALANCE_TPL = """
+AFTER TRANSACTION
+└─ New Balance: {currency} {new_balance:,.2f}
+"""
+
+_TRANSFER_FOOTER_TPL = f"""
+{_SEP}
+Need help? Type 'help' or 'support'
+Receipt generated at {{generated_at}}
+{_SEP}
+"""
+
+_BILL_TPL = f"""
+{_SEP}
+      BILL PAYMENT RECEIPT
+{_SEP}
+Transaction ID: {{transaction_id}}
+Date: {{date}}
+Type: Bill Payment
+
+BILL DETAILS
+├─ Bill Type: {{bill_name}}
+"""
+
+_BILL_PAYMENT_TPL = """├─ Amount: {currency} {amount:,.2f}
+└─ Status: ✅ PAID
+
+PAYMENT FROM
+├─ Account: {account_masked} ({account_type})
+├─ Name: {holder_name}
+└─ Previous Balance: {currency} {previous_balance:,.2f}
+"""
+
+_BILL_BALANCE_TPL = """
+AFTER PAYMENT
+└─ New Balance: {currency} {new_balance:,.2f}
+"""
+
+_BILL_FOOTER_TPL = f"""
+{_SEP}
+Thank you for using our service! 🎉
+Receipt generated at {{generated_at}}
+{_SEP}
+"""
+
+_ACCOUNT_TPL = f"""
+{_SEP}
+  ACCOUNT OPENING CONFIRMATION
+{_SEP}
+Registration ID: {{registration_id}}
+Date: {{date}}
+
+ACCOUNT HOLDER DETAILS
+├─ Name: {{user_name}}
+├─ Phone: {{phone}}
+└─ Email: {{email}} ✅
+
+ACCOUNT DETAILS
+├─ Account Number: {{account_masked}}
+├─ Full Number: {{account_number}}
+├─ Type: {{account_type}} Account
+├─ Currency: {{currency}}
+├─ Opening Balance: {{currency}} 0.00
+└─ Status: ✅ ACTIVE
+
+NEXT STEPS
+1. You can now deposit funds
+2. Start using banking services
+3. Request debit card (optional)
+
+Welcome to the bank! 🎉
+{_SEP}
+"""
 
 
 class ReceiptGenerator:
@@ -16,7 +170,7 @@ class ReceiptGenerator:
     
     def __init__(self):
         """Initialize receipt generator"""
-        self.currency = "PKR"
+        self.currency = _CURRENCY
     
     def generate_transfer_receipt(self, 
                                   transaction_id: str,
@@ -46,7 +200,7 @@ class ReceiptGenerator:
         if format == "json":
             return self._generate_transfer_json(
                 transaction_id, from_account, to_account, 
-                amount, description, new_balance, timestamp
+                amount, description, new_balance, timestamp.isoformat()
             )
         else:
             return self._generate_transfer_text(
@@ -54,6 +208,37 @@ class ReceiptGenerator:
                 amount, description, new_balance, timestamp
             )
     
+    def generate_transfer_receipts(self,
+                                   rows: List[Dict[str, Any]],
+                                   format: str = "text") -> List[str]:
+        """
+        Generate money transfer receipts for a batch of transactions
+        
+        Args:
+            rows: One dict per transfer with the generate_transfer_receipt
+                arguments (transaction_id, from_account, to_account, amount,
+                and optionally description and new_balance)
+            format: "text" or "json"
+            
+        Returns:
+            Formatted receipt strings, in the same order as rows
+        """
+        timestamp = datetime.now()
+        
+        if format == "json":
+            build = self._generate_transfer_json
+            stamp = timestamp.isoformat()
+        else:
+            build = self._generate_transfer_text
+            stamp = timestamp
+        
+        return [
+            build(row['transaction_id'], row['from_account'], row['to_account'],
+                  row['amount'], row.get('description', ""),
+                  row.get('new_balance'), stamp)
+            for row in rows
+        ]
+    
     def _generate_transfer_text(self, transaction_id, from_account, to_account,
                                 amount, description, new_balance, timestamp) -> str:
         """Generate text format receipt"""
@@ -61,87 +246,68 @@ class ReceiptGenerator:
         from_masked = self._mask_account(from_account.get('account_no', ''))
         to_masked = self._mask_account(to_account.get('account_no', ''))
         
-        receipt = f"""
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-       TRANSACTION RECEIPT
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-Transaction ID: {transaction_id}
-Date: {timestamp.strftime('%B %d, %Y at %H:%M PKT')}
-Type: Money Transfer
-
-FROM
-├─ Account: {from_masked} ({from_account.get('account_type', 'N/A').title()})
-├─ Name: {from_account.get('holder_name', 'N/A')}
-└─ Previous Balance: {self.currency} {from_account.get('previous_balance', 0):,.2f}
-
-TO
-├─ Account: {to_masked}
-└─ Name: {to_account.get('holder_name', 'N/A')}
-"""
+        receipt = _TRANSFER_TPL.format(
+            transaction_id=transaction_id,
+            date=timestamp.strftime('%B %d, %Y at %H:%M PKT'),
+            from_masked=from_masked,
+            from_type=_title_account_type(from_account.get('account_type', 'N/A')),
+            from_name=from_account.get('holder_name', 'N/A'),
+            currency=self.currency,
+            previous_balance=from_account.get('previous_balance', 0),
+            to_masked=to_masked,
+            to_name=to_account.get('holder_name', 'N/A')
+        )
         
         if description:
             receipt += f"└─ Reference: {description}\n"
         
-        receipt += f"""
-TRANSACTION DETAILS
-├─ Amount: {self.currency} {amount:,.2f}
-├─ Fee: {self.currency} 0.00
-├─ Total Deducted: {self.currency} {amount:,.2f}
-└─ Status: ✅ SUCCESS
-"""
+        receipt += _TRANSFER_DETAILS_TPL.format(currency=self.currency, amount=amount)
         
         if new_balance is not None:
-            receipt += f"""
-AFTER TRANSACTION
-└─ New Balance: {self.currency} {new_balance:,.2f}
-"""
+            receipt += _TRANSFER_BALANCE_TPL.format(currency=self.currency, new_balance=new_balance)
         
-        receipt += f"""
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-Need help? Type 'help' or 'support'
-Receipt generated at {timestamp.strftime('%Y-%m-%d %H:%M:%S')}
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-"""
+        receipt += _TRANSFER_FOOTER_TPL.format(
+            generated_at=timestamp.strftime('%Y-%m-%d %H:%M:%S')
+        )
         return receipt.strip()
     
     def _generate_transfer_json(self, transaction_id, from_account, to_account,
-                                amount, description, new_balance, timestamp) -> str:
+                                amount, description, new_balance, ts_iso) -> str:
         """Generate JSON format receipt"""
         
-        receipt_data = {
-            "receipt": {
-                "transaction_id": transaction_id,
-                "timestamp": timestamp.isoformat(),
-                "type": "transfer",
-                "status": "success",
-                "from": {
-                    "account_number": from_account.get('account_no', ''),
-                    "masked_number": self._mask_account(from_account.get('account_no', '')),
-                    "account_type": from_account.get('account_type', ''),
-                    "holder_name": from_account.get('holder_name', ''),
-                    "previous_balance": from_account.get('previous_balance', 0)
-                },
-                "to": {
-                    "account_number": to_account.get('account_no', ''),
-                    "masked_number": self._mask_account(to_account.get('account_no', '')),
-                    "holder_name": to_account.get('holder_name', '')
-                },
-                "amounts": {
-                    "principal": amount,
-                    "fee": 0.00,
-                    "total": amount,
-                    "currency": self.currency,
-                    "new_balance": new_balance
-                },
-                "metadata": {
-                    "description": description,
-                    "initiated_by": "chatbot",
-                    "reference": f"REF-{transaction_id}"
-                }
-            }
-        }
+        from_account_no = from_account.get('account_no', '')
+        to_account_no = to_account.get('account_no', '')
         
-        return json.dumps(receipt_data, indent=2)
+        return _encode_receipt(_RECEIPT_KEYS, (
+            transaction_id,
+            ts_iso,
+            _TYPE_TRANSFER,
+            _STATUS_OK,
+            {
+                "account_number": from_account_no,
+                "masked_number": self._mask_account(from_account_no),
+                "account_type": from_account.get('account_type', ''),
+                "holder_name": from_account.get('holder_name', ''),
+                "previous_balance": from_account.get('previous_balance', 0)
+            },
+            {
+                "account_number": to_account_no,
+                "masked_number": self._mask_account(to_account_no),
+                "holder_name": to_account.get('holder_name', '')
+            },
+            {
+                "principal": amount,
+                "fee": 0.00,
+                "total": amount,
+                "currency": self.currency,
+                "new_balance": new_balance
+            },
+            {
+                "description": description,
+                "initiated_by": _INITIATED,
+                "reference": f"REF-{transaction_id}"
+            }
+        ))
     
     def generate_bill_payment_receipt(self,
                                       transaction_id: str,
@@ -171,7 +337,7 @@ Receipt generated at {timestamp.strftime('%Y-%m-%d %H:%M:%S')}
         if format == "json":
             return self._generate_bill_payment_json(
                 transaction_id, bill_type, amount, account,
-                reference_no, new_balance, timestamp
+                reference_no, new_balance, timestamp.isoformat()
             )
         else:
             return self._generate_bill_payment_text(
@@ -186,78 +352,64 @@ Receipt generated at {timestamp.strftime('%Y-%m-%d %H:%M:%S')}
         account_masked = self._mask_account(account.get('account_no', ''))
         bill_name = self._get_bill_display_name(bill_type)
         
-        receipt = f"""
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-      BILL PAYMENT RECEIPT
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-Transaction ID: {transaction_id}
-Date: {timestamp.strftime('%B %d, %Y at %H:%M PKT')}
-Type: Bill Payment
-
-BILL DETAILS
-├─ Bill Type: {bill_name}
-"""
+        receipt = _BILL_TPL.format(
+            transaction_id=transaction_id,
+            date=timestamp.strftime('%B %d, %Y at %H:%M PKT'),
+            bill_name=bill_name
+        )
         
         if reference_no:
             receipt += f"├─ Reference: {reference_no}\n"
         
-        receipt += f"""├─ Amount: {self.currency} {amount:,.2f}
-└─ Status: ✅ PAID
-
-PAYMENT FROM
-├─ Account: {account_masked} ({account.get('account_type', 'N/A').title()})
-├─ Name: {account.get('holder_name', 'N/A')}
-└─ Previous Balance: {self.currency} {account.get('previous_balance', 0):,.2f}
-"""
+        receipt += _BILL_PAYMENT_TPL.format(
+            currency=self.currency,
+            amount=amount,
+            account_masked=account_masked,
+            account_type=_title_account_type(account.get('account_type', 'N/A')),
+            holder_name=account.get('holder_name', 'N/A'),
+            previous_balance=account.get('previous_balance', 0)
+        )
         
         if new_balance is not None:
-            receipt += f"""
-AFTER PAYMENT
-└─ New Balance: {self.currency} {new_balance:,.2f}
-"""
+            receipt += _BILL_BALANCE_TPL.format(currency=self.currency, new_balance=new_balance)
         
-        receipt += f"""
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-Thank you for using our service! 🎉
-Receipt generated at {timestamp.strftime('%Y-%m-%d %H:%M:%S')}
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-"""
+        receipt += _BILL_FOOTER_TPL.format(
+            generated_at=timestamp.strftime('%Y-%m-%d %H:%M:%S')
+        )
         return receipt.strip()
     
     def _generate_bill_payment_json(self, transaction_id, bill_type, amount,
-                                    account, reference_no, new_balance, timestamp) -> str:
+                                    account, reference_no, new_balance, ts_iso) -> str:
         """Generate JSON format bill payment receipt"""
         
-        receipt_data = {
-            "receipt": {
-                "transaction_id": transaction_id,
-                "timestamp": timestamp.isoformat(),
-                "type": "bill_payment",
-                "status": "success",
-                "bill": {
-                    "type": bill_type,
-                    "display_name": self._get_bill_display_name(bill_type),
-                    "reference_number": reference_no,
-                    "amount": amount
-                },
-                "payment_account": {
-                    "account_number": account.get('account_no', ''),
-                    "masked_number": self._mask_account(account.get('account_no', '')),
-                    "account_type": account.get('account_type', ''),
-                    "holder_name": account.get('holder_name', ''),
-                    "previous_balance": account.get('previous_balance', 0)
-                },
-                "amounts": {
-                    "principal": amount,
-                    "fee": 0.00,
-                    "total": amount,
-                    "currency": self.currency,
-                    "new_balance": new_balance
-                }
-            }
-        }
+        account_no = account.get('account_no', '')
         
-        return json.dumps(receipt_data, indent=2)
+        return _encode_receipt(_BILL_RECEIPT_KEYS, (
+            transaction_id,
+            ts_iso,
+            _TYPE_BILL_PAYMENT,
+            _STATUS_OK,
+            {
+                "type": bill_type,
+                "display_name": self._get_bill_display_name(bill_type),
+                "reference_number": reference_no,
+                "amount": amount
+            },
+            {
+                "account_number": account_no,
+                "masked_number": self._mask_account(account_no),
+                "account_type": account.get('account_type', ''),
+                "holder_name": account.get('holder_name', ''),
+                "previous_balance": account.get('previous_balance', 0)
+            },
+            {
+                "principal": amount,
+                "fee": 0.00,
+                "total": amount,
+                "currency": self.currency,
+                "new_balance": new_balance
+            }
+        ))
     
     def generate_account_creation_receipt(self,
                                           user_name: str,
@@ -286,7 +438,7 @@ Receipt generated at {timestamp.strftime('%Y-%m-%d %H:%M:%S')}
         if format == "json":
             return self._generate_account_creation_json(
                 registration_id, user_name, phone, email,
-                account_number, account_type, timestamp
+                account_number, account_type, timestamp.isoformat()
             )
         else:
             return self._generate_account_creation_text(
@@ -300,64 +452,43 @@ Receipt generated at {timestamp.strftime('%Y-%m-%d %H:%M:%S')}
         
         account_masked = self._mask_account(account_number)
         
-        receipt = f"""
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-  ACCOUNT OPENING CONFIRMATION
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-Registration ID: {registration_id}
-Date: {timestamp.strftime('%B %d, %Y at %H:%M PKT')}
-
-ACCOUNT HOLDER DETAILS
-├─ Name: {user_name}
-├─ Phone: {phone}
-└─ Email: {email} ✅
-
-ACCOUNT DETAILS
-├─ Account Number: {account_masked}
-├─ Full Number: {account_number}
-├─ Type: {account_type.title()} Account
-├─ Currency: {self.currency}
-├─ Opening Balance: {self.currency} 0.00
-└─ Status: ✅ ACTIVE
-
-NEXT STEPS
-1. You can now deposit funds
-2. Start using banking services
-3. Request debit card (optional)
-
-Welcome to the bank! 🎉
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-"""
+        receipt = _ACCOUNT_TPL.format(
+            registration_id=registration_id,
+            date=timestamp.strftime('%B %d, %Y at %H:%M PKT'),
+            user_name=user_name,
+            phone=phone,
+            email=email,
+            account_masked=account_masked,
+            account_number=account_number,
+            account_type=_title_account_type(account_type),
+            currency=self.currency
+        )
         return receipt.strip()
     
     def _generate_account_creation_json(self, registration_id, user_name, phone,
-                                        email, account_number, account_type, timestamp) -> str:
+                                        email, account_number, account_type, ts_iso) -> str:
         """Generate JSON format account creation receipt"""
         
-        receipt_data = {
-            "receipt": {
-                "registration_id": registration_id,
-                "timestamp": timestamp.isoformat(),
-                "type": "account_creation",
-                "status": "success",
-                "account_holder": {
-                    "name": user_name,
-                    "phone": phone,
-                    "email": email,
-                    "email_verified": True
-                },
-                "account": {
-                    "account_number": account_number,
-                    "masked_number": self._mask_account(account_number),
-                    "account_type": account_type,
-                    "currency": self.currency,
-                    "opening_balance": 0.00,
-                    "status": "active"
-                }
+        return _encode_receipt(_ACCOUNT_RECEIPT_KEYS, (
+            registration_id,
+            ts_iso,
+            _TYPE_ACCOUNT_CREATION,
+            _STATUS_OK,
+            {
+                "name": user_name,
+                "phone": phone,
+                "email": email,
+                "email_verified": True
+            },
+            {
+                "account_number": account_number,
+                "masked_number": self._mask_account(account_number),
+                "account_type": account_type,
+                "currency": self.currency,
+                "opening_balance": 0.00,
+                "status": _STATUS_ACTIVE
             }
-        }
-        
-        return json.dumps(receipt_data, indent=2)
+        ))
     
     def _mask_account(self, account_number: str) -> str:
         """
@@ -369,10 +500,7 @@ Welcome to the bank! 🎉
         Returns:
             Masked account number (e.g., PK12****3456)
         """
-        if not account_number or len(account_number) < 8:
-            return account_number
-        
-        return account_number[:4] + "****" + account_number[-4:]
+        return _mask(account_number)
     
     def _get_bill_display_name(self, bill_type: str) -> str:
         """Get display name for bill type"""
@@ -397,9 +525,24 @@ Welcome to the bank! 🎉
         Returns:
             Transaction ID (e.g., TXN-20241206-001234)
         """
-        timestamp = datetime.now()
-        random_suffix = f"{timestamp.microsecond:06d}"
-        return f"{transaction_type}-{timestamp.strftime('%Y%m%d')}-{random_suffix}"
+        seconds, fraction = divmod(time.time(), 1)
+        random_suffix = f"{int(fraction * 1_000_000):06d}"
+        date = time.strftime('%Y%m%d', time.localtime(seconds))
+        return f"{transaction_type}-{date}-{random_suffix}"
+    
+    def generate_reference_from(self, transaction_id: str, prefix: str = "BILL") -> str:
+        """
+        Derive a reference number from an existing transaction ID
+        
+        Args:
+            transaction_id: ID from generate_transaction_id
+            prefix: Reference prefix
+            
+        Returns:
+            Reference number (e.g., BILL-TXN-20241206-001234)
+        """
+        _, _, stamp = transaction_id.partition("-")
+        return f"{prefix}-TXN-{stamp}"
 
 
 # Test function
@@ -4,11 +4,64 @@ Generates natural language responses with database data
 """
 
 from typing import Dict, Any, Optional
+from types import MappingProxyType
+from collections import OrderedDict
+import threading
+import time
+from config import VALID_ACCOUNT_TYPES, VALID_BILL_TYPES, TRANSACTION_TYPES
 from database.db_manager import DatabaseManager
 from utils.receipt_generator import ReceiptGenerator
 from utils.error_handler import ErrorHandler
 
 
+# Rendered balance / pending-bills responses are reused for this many
+# seconds, and only while the database's data_version() is unchanged
+RESPONSE_CACHE_TTL = 2.0
+RESPONSE_CACHE_MAX_ENTRIES = 1024
+
+# Format spec for amounts shown to the user
+_PKR_FMT = ",.2f"
+
+# Confirmation prompts, filled with str.format_map on every confirmation turn
+_TRANSFER_CONFIRM_TPL = "Please confirm: Transfer PKR {amount:,.2f} to {payee}? (yes/no)"
+_TRANSFER_CONFIRM_FROM_TPL = (
+    "Please confirm: Transfer PKR {amount:,.2f} to {payee} "
+    "from account {acc4}? (yes/no)"
+)
+_BILL_CONFIRM_TPL = "Please confirm: Pay {bill_type} bill of PKR {amount:,.2f}? (yes/no)"
+
+# Static message text, built once at import time
+_ERROR_MESSAGES = MappingProxyType({
+    'account_not_found': "I couldn't find that account. Please check the account number.",
+    'insufficient_balance': "You don't have sufficient balance for this transaction.",
+    'invalid_amount': "The amount specified is invalid. Please provide a valid amount.",
+    'transfer_failed': "The transfer couldn't be completed. Please try again.",
+    'bill_not_found': "I couldn't find that bill. It may have already been paid.",
+    'payment_failed': "The payment couldn't be processed. Please try again.",
+    'unknown': "Something went wrong. Please try again."
+})
+
+_HELP_MESSAGE = (
+    "I can help you with:\n\n"
+    "💰 Check Balance\n"
+    "   Example: 'What's my balance?'\n\n"
+    "💸 Transfer Money\n"
+    "   Example: 'Transfer 5000 to Ali'\n\n"
+    "🧾 Pay Bills\n"
+    "   Example: 'Pay my electricity bill'\n\n"
+    "📜 Transaction History\n"
+    "   Example: 'Show my recent transactions'\n\n"
+    "📋 View Pending Bills\n"
+    "   Example: 'What bills do I have?'\n\n"
+    "How can I help you today?"
+)
+
+# Display names for the known account, transaction and bill types
+_ACCOUNT_TYPE_TITLE = {t: t.title() for t in VALID_ACCOUNT_TYPES}
+_TRANSACTION_TYPE_TITLE = {t: t.replace('_', ' ').title() for t in TRANSACTION_TYPES}
+_BILL_TYPE_TITLE = {t: t.replace('_', ' ').title() for t in VALID_BILL_TYPES}
+
+
 class ResponseGenerator:
     """
     Generates conversational responses with real data
@@ -24,6 +77,61 @@ class ResponseGenerator:
         self.db = db_manager
         self.receipt_generator = ReceiptGenerator()
         self.error_handler = ErrorHandler()
+        
+        # user_id -> account rows, shared by the responses of one chat turn.
+        # None until begin_turn(), so callers outside a turn always read fresh.
+        self._turn_accounts: Optional[Dict[int, list]] = None
+        
+        # Short-lived response caches: key -> (stored_at, data_version, response)
+        self._balance_cache: OrderedDict = OrderedDict()
+        self._bills_cache: OrderedDict = OrderedDict()
+        self._cache_lock = threading.Lock()
+    
+    def _cache_get(self, cache: OrderedDict, key, version: int) -> Optional[str]:
+        """Return a cached response if it is still fresh"""
+        with self._cache_lock:
+            hit = cache.get(key)
+            if hit is None:
+                return None
+            
+            stored_at, stored_version, response = hit
+            if stored_version != version or time.monotonic() - stored_at >= RESPONSE_CACHE_TTL:
+                del cache[key]
+                return None
+            
+            cache.move_to_end(key)
+            return response
+    
+    def _cache_put(self, cache: OrderedDict, key, version: int, response: str):
+        """Store a response, evicting the least recently used entry if full"""
+        with self._cache_lock:
+            cache[key] = (time.monotonic(), version, response)
+            cache.move_to_end(key)
+            if len(cache) > RESPONSE_CACHE_MAX_ENTRIES:
+                cache.popitem(last=False)
+    
+    def begin_turn(self):
+        """Start a chat turn, forgetting account lists read by the previous one"""
+        self._turn_accounts = {}
+    
+    def _get_user_accounts_cached(self, user_id: int) -> list:
+        """
+        Get a user's accounts, read at most once per chat turn
+        
+        Args:
+            user_id: User ID
+            
+        Returns:
+            List of account rows
+        """
+        turn_accounts = self._turn_accounts
+        if turn_accounts is None:
+            return self.db.get_user_accounts(user_id)
+        
+        accounts = turn_accounts.get(user_id)
+        if accounts is None:
+            accounts = turn_accounts[user_id] = self.db.get_user_accounts(user_id)
+        return accounts
     
     def generate_balance_response(self, user_id: int, account_no: Optional[str] = None) -> str:
         """
@@ -36,6 +144,18 @@ class ResponseGenerator:
         Returns:
             Response message
         """
+        # Read the version first: a write that lands while the response is
+        # built leaves the entry stale, and the next lookup rebuilds it
+        version = self.db.data_version()
+        key = (user_id, account_no)
+        response = self._cache_get(self._balance_cache, key, version)
+        if response is None:
+            response = self._build_balance_response(user_id, account_no)
+            self._cache_put(self._balance_cache, key, version, response)
+        return response
+    
+    def _build_balance_response(self, user_id: int, account_no: Optional[str]) -> str:
+        """Build the balance response from the database"""
         if account_no:
             balance = self.db.get_balance(account_no)
             if balance is None:
@@ -44,11 +164,11 @@ class ResponseGenerator:
             account = self.db.get_account_by_number(account_no)
             return (
                 f"Your {account['account_type']} account balance is "
-                f"PKR {balance:,.2f}"
+                f"{self._pkr(balance)}"
             )
         else:
             # Get all user accounts
-            accounts = self.db.get_user_accounts(user_id)
+            accounts = self._get_user_accounts_cached(user_id)
             if not accounts:
                 return "You don't have any active accounts."
             
@@ -56,15 +176,16 @@ class ResponseGenerator:
                 acc = accounts[0]
                 return (
                     f"Your {acc['account_type']} account balance is "
-                    f"PKR {acc['balance']:,.2f}"
+                    f"{self._pkr(acc['balance'])}"
                 )
             else:
                 # Multiple accounts
                 response = "Here are your account balances:\n"
                 for acc in accounts:
+                    account_type = acc['account_type']
                     response += (
-                        f"• {acc['account_type'].title()}: "
-                        f"PKR {acc['balance']:,.2f}\n"
+                        f"• {_ACCOUNT_TYPE_TITLE.get(account_type) or account_type.title()}: "
+                        f"{self._pkr(acc['balance'])}\n"
                     )
                 return response.strip()
     
@@ -82,14 +203,11 @@ class ResponseGenerator:
             Confirmation message
         """
         if from_account:
-            return (
-                f"Please confirm: Transfer PKR {amount:,.2f} to {payee} "
-                f"from account {from_account[-4:]}? (yes/no)"
+            return _TRANSFER_CONFIRM_FROM_TPL.format_map(
+                {'amount': amount, 'payee': payee, 'acc4': from_account[-4:]}
             )
         else:
-            return (
-                f"Please confirm: Transfer PKR {amount:,.2f} to {payee}? (yes/no)"
-            )
+            return _TRANSFER_CONFIRM_TPL.format_map({'amount': amount, 'payee': payee})
     
     def generate_transfer_success(self, amount: float, payee: str,
                                   new_balance: Optional[float] = None,
@@ -122,10 +240,10 @@ class ResponseGenerator:
             return receipt
         
         # Fallback to simple message
-        message = f"✅ Successfully transferred PKR {amount:,.2f} to {payee}."
+        message = f"✅ Successfully transferred {self._pkr(amount)} to {payee}."
         
         if new_balance is not None:
-            message += f"\nYour new balance is PKR {new_balance:,.2f}"
+            message += f"\nYour new balance is {self._pkr(new_balance)}"
         
         return message
     
@@ -140,9 +258,7 @@ class ResponseGenerator:
         Returns:
             Confirmation message
         """
-        return (
-            f"Please confirm: Pay {bill_type} bill of PKR {amount:,.2f}? (yes/no)"
-        )
+        return _BILL_CONFIRM_TPL.format_map({'bill_type': bill_type, 'amount': amount})
     
     def generate_bill_payment_success(self, bill_type: str, amount: float,
                                      new_balance: Optional[float] = None,
@@ -161,22 +277,23 @@ class ResponseGenerator:
         """
         # If account details provided, generate professional receipt (Phase 2)
         if account:
+            transaction_id = self.receipt_generator.generate_transaction_id("BILL")
             receipt = self.receipt_generator.generate_bill_payment_receipt(
-                transaction_id=self.receipt_generator.generate_transaction_id("BILL"),
+                transaction_id=transaction_id,
                 bill_type=bill_type,
                 amount=amount,
                 account=account,
-                reference_no=f"BILL-{self.receipt_generator.generate_transaction_id()}",
+                reference_no=self.receipt_generator.generate_reference_from(transaction_id),
                 new_balance=new_balance,
                 format="text"
             )
             return receipt
         
         # Fallback to simple message
-        message = f"✅ Successfully paid {bill_type} bill of PKR {amount:,.2f}."
+        message = f"✅ Successfully paid {bill_type} bill of {self._pkr(amount)}."
         
         if new_balance is not None:
-            message += f"\nYour new balance is PKR {new_balance:,.2f}"
+            message += f"\nYour new balance is {self._pkr(new_balance)}"
         
         return message
     
@@ -191,31 +308,28 @@ class ResponseGenerator:
         Returns:
             Transaction history message
         """
-        # Get user's first account
-        accounts = self.db.get_user_accounts(user_id)
-        if not accounts:
+        # Accounts + transactions in a single query; the accounts lookup is
+        # only needed to word the empty result
+        transactions = self.db.get_history_for_user(user_id, limit)
+        if not transactions and not self._get_user_accounts_cached(user_id):
             return "You don't have any active accounts."
         
-        # Get transactions
-        transactions = self.db.get_transaction_history(accounts[0]['id'], limit)
-        
         if not transactions:
             return "You don't have any recent transactions."
         
-        response = f"Here are your last {len(transactions)} transactions:\n\n"
+        parts = [f"Here are your last {len(transactions)} transactions:", ""]
+        append = parts.append
         
         for i, txn in enumerate(transactions, 1):
             date = txn['timestamp'][:10]  # YYYY-MM-DD
-            txn_type = txn['type'].replace('_', ' ').title()
+            txn_type = _TRANSACTION_TYPE_TITLE.get(txn['type']) or txn['type'].replace('_', ' ').title()
             amount = txn['amount']
             desc = txn['description'] or 'Transaction'
             
-            response += (
-                f"{i}. {date} - {txn_type}\n"
-                f"   PKR {amount:,.2f} - {desc}\n"
-            )
+            append(f"{i}. {date} - {txn_type}")
+            append(f"   {self._pkr(amount)} - {desc}")
         
-        return response.strip()
+        return "\n".join(parts)
     
     def generate_pending_bills_response(self, user_id: int) -> str:
         """
@@ -227,24 +341,32 @@ class ResponseGenerator:
         Returns:
             Pending bills message
         """
+        version = self.db.data_version()
+        response = self._cache_get(self._bills_cache, user_id, version)
+        if response is None:
+            response = self._build_pending_bills_response(user_id)
+            self._cache_put(self._bills_cache, user_id, version, response)
+        return response
+    
+    def _build_pending_bills_response(self, user_id: int) -> str:
+        """Build the pending bills response from the database"""
         bills = self.db.get_user_bills(user_id, status='unpaid')
         
         if not bills:
             return "You don't have any pending bills. You're all caught up! ✅"
         
-        response = f"You have {len(bills)} pending bill(s):\n\n"
+        parts = [f"You have {len(bills)} pending bill(s):", ""]
+        append = parts.append
         
         for i, bill in enumerate(bills, 1):
-            bill_type = bill['type'].replace('_', ' ').title()
+            bill_type = _BILL_TYPE_TITLE.get(bill['type']) or bill['type'].replace('_', ' ').title()
             amount = bill['amount']
             due_date = bill['due_date']
             
-            response += (
-                f"{i}. {bill_type}\n"
-                f"   PKR {amount:,.2f} - Due: {due_date}\n"
-            )
+            append(f"{i}. {bill_type}")
+            append(f"   {self._pkr(amount)} - Due: {due_date}")
         
-        return response.strip()
+        return "\n".join(parts)
     
     def generate_error_message(self, error_type: str, details: Optional[str] = None) -> str:
         """
@@ -257,17 +379,7 @@ class ResponseGenerator:
         Returns:
             Error message
         """
-        messages = {
-            'account_not_found': "I couldn't find that account. Please check the account number.",
-            'insufficient_balance': "You don't have sufficient balance for this transaction.",
-            'invalid_amount': "The amount specified is invalid. Please provide a valid amount.",
-            'transfer_failed': "The transfer couldn't be completed. Please try again.",
-            'bill_not_found': "I couldn't find that bill. It may have already been paid.",
-            'payment_failed': "The payment couldn't be processed. Please try again.",
-            'unknown': "Something went wrong. Please try again."
-        }
-        
-        message = messages.get(error_type, messages['unknown'])
+        message = _ERROR_MESSAGES.get(error_type, _ERROR_MESSAGES['unknown'])
         
         if details:
             message += f"\n{details}"
@@ -276,20 +388,12 @@ class ResponseGenerator:
     
     def generate_help_message(self) -> str:
         """Generate help message with available commands"""
-        return (
-            "I can help you with:\n\n"
-            "💰 Check Balance\n"
-            "   Example: 'What's my balance?'\n\n"
-            "💸 Transfer Money\n"
-            "   Example: 'Transfer 5000 to Ali'\n\n"
-            "🧾 Pay Bills\n"
-            "   Example: 'Pay my electricity bill'\n\n"
-            "📜 Transaction History\n"
-            "   Example: 'Show my recent transactions'\n\n"
-            "📋 View Pending Bills\n"
-            "   Example: 'What bills do I have?'\n\n"
-            "How can I help you today?"
-        )
+        return _HELP_MESSAGE
+    
+    @staticmethod
+    def _pkr(amount: float) -> str:
+        """Format an amount as PKR for display"""
+        return "PKR " + format(amount, _PKR_FMT)
     
     def format_currency(self, amount: float, currency: str = "PKR") -> str:
         """
@@ -302,7 +406,9 @@ class ResponseGenerator:
         Returns:
             Formatted currency string
         """
-        return f"{currency} {amount:,.2f}"
+        if currency == "PKR":
+            return self._pkr(amount)
+        return f"{currency} {format(amount, _PKR_FMT)}"
     
 
 
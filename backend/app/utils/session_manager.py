@@ -3,8 +3,11 @@ Session Manager
 Manages user sessions and dialogue states
 """
 
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Set, Tuple
+from collections import Counter, defaultdict
 from datetime import datetime, timedelta
+import heapq
+import time
 import uuid
 from ml.dialogue.dialogue_state import DialogueState
 import threading
@@ -12,11 +15,27 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Number of independently locked session buckets (must be a power of two)
+SESSION_SHARDS = 16
+
+# Seconds between background cleanup passes
+CLEANUP_INTERVAL_SECONDS = 300
+
+# Estimated session count above which save_session wakes the cleanup thread
+SESSION_HIGH_WATER = 10000
+
+# Minimum seconds between a cleanup pass and an early pass requested by
+# save_session
+EARLY_CLEANUP_MIN_INTERVAL_SECONDS = 5
+
 
 class SessionManager:
     """
     Manages conversation sessions
     Stores dialogue states in memory with automatic cleanup
+    
+    Sessions are spread over SESSION_SHARDS buckets, each guarded by its
+    own lock, so turns on unrelated sessions do not contend.
     """
     
     def __init__(self, session_timeout_minutes: int = 30):
@@ -26,13 +45,98 @@ class SessionManager:
         Args:
             session_timeout_minutes: Session timeout in minutes
         """
-        self.sessions: Dict[str, DialogueState] = {}
+        self._shards: List[Tuple[Dict[str, DialogueState], threading.Lock]] = [
+            ({}, threading.Lock()) for _ in range(SESSION_SHARDS)
+        ]
         self.session_timeout = timedelta(minutes=session_timeout_minutes)
-        self.lock = threading.Lock()
+        self.session_timeout_s = self.session_timeout.total_seconds()
+        
+        # Per-shard session_id -> time.monotonic() of the last create/save.
+        # Expiry runs on this clock so wall-clock jumps cannot expire sessions.
+        self._touched: List[Dict[str, float]] = [{} for _ in range(SESSION_SHARDS)]
+        
+        # Per-shard min-heaps of (expires_at, session_id) on the monotonic
+        # clock, guarded by the shard lock. Entries go stale when a session is
+        # saved again (the save pushes the newer deadline); cleanup drops them
+        # after re-checking _touched, and saves rebuild a heap that has grown
+        # past twice the shard's live sessions.
+        self._expiry_heaps: List[List[Tuple[float, str]]] = [
+            [] for _ in range(SESSION_SHARDS)
+        ]
+        
+        # Per-shard session_id -> status value as of the last save, so stats
+        # never have to touch the DialogueState objects
+        self._statuses: List[Dict[str, str]] = [{} for _ in range(SESSION_SHARDS)]
+        
+        # Per-shard running totals of _statuses, kept in step on every status
+        # change so stats are read without walking the sessions
+        self._status_counts: List[Counter] = [Counter() for _ in range(SESSION_SHARDS)]
+        
+        # Secondary index: user_id -> session IDs (lock taken after a shard lock)
+        self._by_user: Dict[int, Set[str]] = defaultdict(set)
+        self._index_lock = threading.Lock()
+        
+        # _stop ends the cleanup thread; _wake requests an early pass
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        
+        # time.monotonic() at the start of the last cleanup pass
+        self._last_cleanup = time.monotonic()
         
         # Start cleanup thread
         self._start_cleanup_thread()
     
+    def _shard_of(self, session_id: str) -> int:
+        """Index of the shard that owns a session ID"""
+        return hash(session_id) & (SESSION_SHARDS - 1)
+    
+    def _index_add(self, user_id: int, session_id: str):
+        """Record a session under its user in the secondary index"""
+        with self._index_lock:
+            self._by_user[user_id].add(session_id)
+    
+    def _index_discard(self, user_id: int, session_id: str):
+        """Remove a session from the secondary index"""
+        with self._index_lock:
+            session_ids = self._by_user.get(user_id)
+            if session_ids is not None:
+                session_ids.discard(session_id)
+                if not session_ids:
+                    del self._by_user[user_id]
+    
+    def _set_status(self, shard: int, session_id: str, status: str):
+        """Record a session's status and update the totals (caller holds the shard lock)"""
+        previous = self._statuses[shard].get(session_id)
+        if previous == status:
+            return
+        counts = self._status_counts[shard]
+        if previous is not None:
+            counts[previous] -= 1
+            if not counts[previous]:
+                del counts[previous]
+        counts[status] += 1
+        self._statuses[shard][session_id] = status
+    
+    def _untrack(self, shard: int, session_id: str, user_id: int):
+        """Drop bookkeeping for a removed session (caller holds the shard lock)"""
+        status = self._statuses[shard].pop(session_id, None)
+        if status is not None:
+            counts = self._status_counts[shard]
+            counts[status] -= 1
+            if not counts[status]:
+                del counts[status]
+        self._touched[shard].pop(session_id, None)
+        self._index_discard(user_id, session_id)
+    
+    def _compact_heap(self, shard: int):
+        """Rebuild a shard's expiry heap once stale entries pile up (caller holds the shard lock)"""
+        heap = self._expiry_heaps[shard]
+        touched = self._touched[shard]
+        if len(heap) <= 2 * len(touched):
+            return
+        heap[:] = [(at + self.session_timeout_s, session_id) for session_id, at in touched.items()]
+        heapq.heapify(heap)
+    
     def create_session(self, user_id: int) -> str:
         """
         Create a new session
@@ -44,10 +148,18 @@ class SessionManager:
             Session ID
         """
         session_id = str(uuid.uuid4())
+        state = DialogueState(user_id=user_id, session_id=session_id)
         
-        with self.lock:
-            state = DialogueState(user_id=user_id, session_id=session_id)
-            self.sessions[session_id] = state
+        shard = self._shard_of(session_id)
+        sessions, lock = self._shards[shard]
+        with lock:
+            now = time.monotonic()
+            sessions[session_id] = state
+            self._set_status(shard, session_id, state.status.value)
+            self._touched[shard][session_id] = now
+            self._index_add(user_id, session_id)
+            heapq.heappush(self._expiry_heaps[shard],
+                           (now + self.session_timeout_s, session_id))
         
         return session_id
     
@@ -61,15 +173,18 @@ class SessionManager:
         Returns:
             DialogueState or None if not found
         """
-        with self.lock:
-            state = self.sessions.get(session_id)
+        shard = self._shard_of(session_id)
+        sessions, lock = self._shards[shard]
+        with lock:
+            state = sessions.get(session_id)
             
             if state:
                 # Check if session expired
-                time_since_update = datetime.now() - state.last_updated
-                if time_since_update > self.session_timeout:
+                time_since_update = time.monotonic() - self._touched[shard][session_id]
+                if time_since_update > self.session_timeout_s:
                     # Session expired, remove it
-                    del self.sessions[session_id]
+                    del sessions[session_id]
+                    self._untrack(shard, session_id, state.user_id)
                     return None
             
             return state
@@ -82,9 +197,37 @@ class SessionManager:
             session_id: Session identifier
             state: Dialogue state to save
         """
-        with self.lock:
+        shard = self._shard_of(session_id)
+        sessions, lock = self._shards[shard]
+        with lock:
+            now = time.monotonic()
+            previous = sessions.get(session_id)
+            # Wall-clock time for display; expiry uses the monotonic `now`
             state.last_updated = datetime.now()
-            self.sessions[session_id] = state
+            self._set_status(shard, session_id, state.status.value)
+            self._touched[shard][session_id] = now
+            heapq.heappush(self._expiry_heaps[shard],
+                           (now + self.session_timeout_s, session_id))
+            
+            # Callers normally mutate the stored object in place, so only a
+            # replaced or brand-new state needs writing back
+            if previous is not state:
+                sessions[session_id] = state
+                if previous is not None:
+                    self._index_discard(previous.user_id, session_id)
+                self._index_add(state.user_id, session_id)
+            
+            self._compact_heap(shard)
+            
+            # Shards fill evenly, so one shard's size is a cheap estimate.
+            # An early pass only helps once some deadline has passed.
+            heap = self._expiry_heaps[shard]
+            backlog = (len(sessions) * SESSION_SHARDS > SESSION_HIGH_WATER
+                       and heap[0][0] < now)
+        
+        if (backlog and now - self._last_cleanup >= EARLY_CLEANUP_MIN_INTERVAL_SECONDS
+                and not self._wake.is_set()):
+            self._wake.set()
     
     def delete_session(self, session_id: str) -> bool:
         """
@@ -96,9 +239,12 @@ class SessionManager:
         Returns:
             True if deleted, False if not found
         """
-        with self.lock:
-            if session_id in self.sessions:
-                del self.sessions[session_id]
+        shard = self._shard_of(session_id)
+        sessions, lock = self._shards[shard]
+        with lock:
+            state = sessions.pop(session_id, None)
+            if state is not None:
+                self._untrack(shard, session_id, state.user_id)
                 return True
             return False
     
@@ -112,34 +258,46 @@ class SessionManager:
         Returns:
             List of session IDs
         """
-        with self.lock:
-            return [
-                session_id 
-                for session_id, state in self.sessions.items()
-                if state.user_id == user_id
-            ]
+        with self._index_lock:
+            return list(self._by_user.get(user_id, ()))
     
     def cleanup_expired_sessions(self):
         """Remove expired sessions"""
-        with self.lock:
-            now = datetime.now()
-            expired = [
-                session_id
-                for session_id, state in self.sessions.items()
-                if now - state.last_updated > self.session_timeout
-            ]
-            
-            for session_id in expired:
-                del self.sessions[session_id]
-            
-            if expired:
-                logger.info(f"🧹 Cleaned up {len(expired)} expired sessions")
+        self._last_cleanup = time.monotonic()
+        total_expired = 0
+        for shard, ((sessions, lock), heap) in enumerate(zip(self._shards, self._expiry_heaps)):
+            touched = self._touched[shard]
+            with lock:
+                now = time.monotonic()
+                while heap and heap[0][0] < now:
+                    _, session_id = heapq.heappop(heap)
+                    state = sessions.get(session_id)
+                    if state is None:
+                        continue  # already deleted or expired
+                    
+                    # A session saved since this entry was queued is not
+                    # expired; that save pushed its newer deadline
+                    if touched[session_id] + self.session_timeout_s < now:
+                        del sessions[session_id]
+                        self._untrack(shard, session_id, state.user_id)
+                        total_expired += 1
+        
+        if total_expired:
+            logger.info(f"🧹 Cleaned up {total_expired} expired sessions")
 
     def clear_all_sessions(self) -> int:
         """Clear all sessions from memory and return the number cleared"""
-        with self.lock:
-            count = len(self.sessions)
-            self.sessions.clear()
+        count = 0
+        for shard, ((sessions, lock), heap) in enumerate(zip(self._shards, self._expiry_heaps)):
+            with lock:
+                count += len(sessions)
+                sessions.clear()
+                heap.clear()
+                self._statuses[shard].clear()
+                self._status_counts[shard].clear()
+                self._touched[shard].clear()
+        with self._index_lock:
+            self._by_user.clear()
         if count:
             logger.info(f"🧹 Cleared all sessions ({count}) via clear_all_sessions")
         return count
@@ -147,35 +305,51 @@ class SessionManager:
     def _start_cleanup_thread(self):
         """Start background thread for session cleanup"""
         def cleanup_loop():
-            import time
-            while True:
-                time.sleep(300)  # Run every 5 minutes
+            while not self._stop.is_set():
+                # Run every 5 minutes, or sooner when woken
+                self._wake.wait(CLEANUP_INTERVAL_SECONDS)
+                self._wake.clear()
+                if self._stop.is_set():
+                    break
                 self.cleanup_expired_sessions()
         
-        cleanup_thread = threading.Thread(target=cleanup_loop, daemon=True)
-        cleanup_thread.start()
+        self._cleanup_thread = threading.Thread(target=cleanup_loop, daemon=True)
+        self._cleanup_thread.start()
+    
+    def shutdown(self, timeout: Optional[float] = None):
+        """
+        Stop the background cleanup thread
+        
+        Args:
+            timeout: Seconds to wait for the thread to exit (None waits)
+        """
+        self._stop.set()
+        self._wake.set()
+        self._cleanup_thread.join(timeout)
     
     def get_session_count(self) -> int:
         """Get total number of active sessions"""
-        with self.lock:
-            return len(self.sessions)
+        count = 0
+        for sessions, lock in self._shards:
+            with lock:
+                count += len(sessions)
+        return count
     
     def get_stats(self) -> Dict:
         """Get session statistics"""
-        with self.lock:
-            return {
-                'total_sessions': len(self.sessions),
-                'sessions_by_status': self._count_by_status(),
-                'timeout_minutes': self.session_timeout.total_seconds() / 60
-            }
+        return {
+            'total_sessions': self.get_session_count(),
+            'sessions_by_status': self._count_by_status(),
+            'timeout_minutes': self.session_timeout.total_seconds() / 60
+        }
     
     def _count_by_status(self) -> Dict[str, int]:
         """Count sessions by status"""
-        status_counts = {}
-        for state in self.sessions.values():
-            status = state.status.value
-            status_counts[status] = status_counts.get(status, 0) + 1
-        return status_counts
+        status_counts = Counter()
+        for (_, lock), counts in zip(self._shards, self._status_counts):
+            with lock:
+                status_counts.update(counts)
+        return dict(status_counts)
 
 
 # Example usage
@@ -3,6 +3,7 @@ Configuration file for Bank Teller Chatbot
 Centralized settings with environment variable support
 """
 import os
+import re
 from pathlib import Path
 from typing import List
 from dotenv import load_dotenv
@@ -94,14 +95,21 @@ ENTITY_PATTERNS = {
     'recipient': r'(?:to|for|from)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)',
 }
 
+# Compiled once at import time for the per-message extraction path
+COMPILED_ENTITY_PATTERNS = {
+    name: re.compile(pattern) for name, pattern in ENTITY_PATTERNS.items()
+}
+
 # Bill types (predefined list)
 VALID_BILL_TYPES = [
     'electricity', 'gas', 'water', 'internet', 'mobile', 
     'phone', 'cable', 'utility', 'utilities'
 ]
+VALID_BILL_TYPES_SET = frozenset(VALID_BILL_TYPES)
 
 # Account types
 VALID_ACCOUNT_TYPES = ['savings', 'current', 'salary', 'checking']
+VALID_ACCOUNT_TYPES_SET = frozenset(VALID_ACCOUNT_TYPES)
 
 # ============================================================================
 # Banking Business Rules
@@ -172,6 +180,14 @@ USE_SPACY = False  # Set to True when spaCy is installed and needed
 # Helper Functions
 # ============================================================================
 
+def _existing_entries(directory: Path) -> set:
+    """Names of the entries in a directory (empty if it doesn't exist yet)"""
+    try:
+        with os.scandir(directory) as entries:
+            return {entry.name for entry in entries}
+    except FileNotFoundError:
+        return set()
+
 def create_directories():
     """Create all necessary directories if they don't exist"""
     directories = [
@@ -185,17 +201,23 @@ def create_directories():
         TESTS_DIR / "fixtures",
     ]
     
+    # One directory listing per parent answers every existence check
+    listings = {}
     created = []
     for directory in directories:
-        if not directory.exists():
+        parent = directory.parent
+        if parent not in listings:
+            listings[parent] = _existing_entries(parent)
+        
+        if directory.name not in listings[parent]:
             directory.mkdir(parents=True, exist_ok=True)
+            listings[parent].add(directory.name)
             created.append(str(directory.relative_to(BASE_DIR)))
     
     # Create .gitkeep files to preserve empty directories in git
+    # (O_CREAT without O_TRUNC leaves existing files untouched)
     for directory in [RAW_DATA_DIR, PROCESSED_DATA_DIR, MODELS_DIR]:
-        gitkeep = directory / ".gitkeep"
-        if not gitkeep.exists():
-            gitkeep.touch()
+        os.close(os.open(directory / ".gitkeep", os.O_WRONLY | os.O_CREAT, 0o644))
     
     if created:
         print(f"✅ Created {len(created)} directories:")
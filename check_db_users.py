@@ -1,51 +1,49 @@
 """
 Quick script to check if accounts were created in the database
 """
-import sqlite3
-import os
+from _db import DB_PATH, run_cached, close_conn
 
-db_path = os.path.join(os.path.dirname(__file__), 'data', 'bank_demo.db')
-
-print(f"Querying database: {db_path}\n")
-
-conn = sqlite3.connect(db_path)
-conn.row_factory = sqlite3.Row
-cursor = conn.cursor()
+print(f"Querying database: {DB_PATH}\n")
 
+# Rows are plain tuples, unpacked in the order of each SELECT's columns
 try:
     # Count users
-    cursor.execute("SELECT COUNT(*) as count FROM users")
-    total_users = cursor.fetchone()['count']
+    (total_users,) = run_cached("SELECT COUNT(*) FROM users").fetchone()
     print(f"Total users in database: {total_users}")
     
     # Get recent users
     print("\nRecent users (last 5):")
-    cursor.execute("SELECT id, name, phone, email, created_at FROM users ORDER BY id DESC LIMIT 5")
-    for row in cursor.fetchall():
-        print(f"  ID: {row['id']}, Name: {row['name']}, Phone: {row['phone']}, Email: {row['email']}, Created: {row['created_at']}")
+    for user_id, name, phone, email, created_at in run_cached("SELECT id, name, phone, email, created_at FROM users ORDER BY id DESC LIMIT 5"):
+        print(f"  ID: {user_id}, Name: {name}, Phone: {phone}, Email: {email}, Created: {created_at}")
     
     # Count accounts
-    cursor.execute("SELECT COUNT(*) as count FROM accounts")
-    total_accounts = cursor.fetchone()['count']
+    (total_accounts,) = run_cached("SELECT COUNT(*) FROM accounts").fetchone()
     print(f"\nTotal accounts in database: {total_accounts}")
     
     # Get recent accounts
     print("\nRecent accounts (last 5):")
-    cursor.execute("SELECT id, user_id, account_no, account_type, balance, created_at FROM accounts ORDER BY id DESC LIMIT 5")
-    for row in cursor.fetchall():
-        print(f"  ID: {row['id']}, User ID: {row['user_id']}, Account: {row['account_no']}, Type: {row['account_type']}, Balance: {row['balance']}, Created: {row['created_at']}")
+    for acc_id, user_id, account_no, account_type, balance, created_at in run_cached("SELECT id, user_id, account_no, account_type, balance, created_at FROM accounts ORDER BY id DESC LIMIT 5"):
+        print(f"  ID: {acc_id}, User ID: {user_id}, Account: {account_no}, Type: {account_type}, Balance: {balance}, Created: {created_at}")
     
     # Check for ahmed@example.com
     print("\n\nSearching for 'ahmed' or 'example.com' users:")
-    cursor.execute("SELECT * FROM users WHERE name LIKE '%ahmed%' OR email LIKE '%example%'")
-    results = cursor.fetchall()
-    if results:
-        for row in results:
-            print(f"  Found: {row['name']} ({row['email']})")
+    # DatabaseManager creates the users_fts trigram index where SQLite supports it
+    if run_cached("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users_fts'").fetchone():
+        results = run_cached(
+            "SELECT u.name, u.email FROM users u JOIN users_fts ON users_fts.rowid = u.id "
+            "WHERE users_fts MATCH 'name:ahmed OR email:example'"
+        )
     else:
+        results = run_cached("SELECT name, email FROM users WHERE name LIKE '%ahmed%' OR email LIKE '%example%'")
+    # Stream rows straight from the cursor rather than materializing them
+    found = False
+    for name, email in results:
+        found = True
+        print(f"  Found: {name} ({email})")
+    if not found:
         print("  No users found with 'ahmed' or 'example.com'")
     
 finally:
-    conn.close()
+    close_conn()
 
 print("\n" + "="*80)
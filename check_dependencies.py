@@ -18,17 +18,27 @@ except ImportError as e:
     print("❌ typing module missing:", e)
 
 # Test spaCy
+# Package metadata answers "is it installed?" without running spaCy's heavy
+# import; pass --load-model to actually import spaCy and load the model.
+from importlib.metadata import version, PackageNotFoundError
+
 try:
-    import spacy
-    print(f"✅ spaCy installed: {spacy.__version__}")
+    print(f"✅ spaCy installed: {version('spacy')}")
     try:
-        nlp = spacy.load('en_core_web_sm')
-        print("✅ spaCy model loaded successfully")
-    except OSError:
+        if '--load-model' in sys.argv:
+            import spacy
+            nlp = spacy.load('en_core_web_sm')
+            print("✅ spaCy model loaded successfully")
+        else:
+            print(f"✅ spaCy model installed: {version('en_core_web_sm')}")
+    except ImportError as e:
+        # Installed according to its metadata, but the import itself fails
+        print("❌ spaCy failed to import:", e)
+    except (OSError, PackageNotFoundError):
         print("⚠️  spaCy model not found. Installing...")
         import subprocess
         subprocess.run([sys.executable, "-m", "spacy", "download", "en_core_web_sm"], check=False)
-except ImportError:
+except PackageNotFoundError:
     print("❌ spaCy not installed. Installing...")
     import subprocess
     subprocess.run([sys.executable, "-m", "pip", "install", "spacy", "-q"], check=False)
@@ -1,25 +1,27 @@
-import sqlite3
+from itertools import groupby
 
-conn = sqlite3.connect('data/bank_demo.db')
-c = conn.cursor()
+from _db import run_cached, close_conn
 
 # Get schema for users table
-c.execute("PRAGMA table_info(users)")
-schema = c.fetchall()
 print("Users table schema:")
-for row in schema:
+for row in run_cached("PRAGMA table_info(users)"):
     print(f"  {row}")
 
-# Get all users
-c.execute('SELECT * FROM users ORDER BY id DESC LIMIT 5')
-users = c.fetchall()
+# Get recent users with their accounts in one query; the last three
+# columns are the account, NULL for users without one
+rows = run_cached('''
+    SELECT u.*, a.id, a.account_type, a.balance
+    FROM (SELECT * FROM users ORDER BY id DESC LIMIT 5) u
+    LEFT JOIN accounts a ON a.user_id = u.id
+    ORDER BY u.id DESC, a.id DESC
+''')
 print("\nRecent users:")
-for user in users:
-    print(f"  {user}")
-    uid = user[0]
-    c.execute('SELECT id, account_type, balance FROM accounts WHERE user_id = ? ORDER BY id DESC', (uid,))
-    accounts = c.fetchall()
-    for acc_id, acc_type, balance in accounts:
-        print(f"    - Account {acc_id}: {acc_type} (balance: {balance})")
+for _, user_rows in groupby(rows, key=lambda r: r[0]):
+    first = next(user_rows)
+    print(f"  {first[:-3]}")
+    for row in (first, *user_rows):
+        acc_id, acc_type, balance = row[-3:]
+        if acc_id is not None:
+            print(f"    - Account {acc_id}: {acc_type} (balance: {balance})")
 
-conn.close()
+close_conn()
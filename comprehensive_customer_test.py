@@ -3,64 +3,108 @@
 Bank Teller Chatbot - Comprehensive Customer Test
 Acts as a real bank customer testing all major functionality
 """
-import requests
-import json
-import time
-
-BASE_URL = "http://localhost:8000/api/chat"
-SESSION_ID = None
-
-def send_message(msg):
+import asyncio
+
+from _http import async_client
+from _net import API_BASE
+
+BASE_URL = f"{API_BASE}/api/chat"
+
+# Each phase runs in its own chat session, so the phases are independent and
+# run concurrently; turns within a phase stay in order.
+# Entries: (result name, test name, message, expected keywords)
+PHASES = [
+    ("[PHASE 1] GREETING & SETUP", [
+        ("Greeting", "Greeting", "Hi there", ["help"]),
+    ]),
+    ("[PHASE 2] BALANCE INQUIRY", [
+        ("Check Balance", "Check Balance", "What's my account balance?", ["balance", "PKR"]),
+    ]),
+    ("[PHASE 3] TRANSACTION HISTORY", [
+        ("Check Transactions", "Recent Transactions", "Show me my recent transactions", ["transaction"]),
+    ]),
+    ("[PHASE 4] MONEY TRANSFER", [
+        ("Transfer Request", "Transfer Request", "I want to transfer 5000 to Ali", ["account"]),
+        ("Transfer Confirm", "Transfer Confirmation", "Yes, confirm that", []),
+    ]),
+    ("[PHASE 5] BILL PAYMENT", [
+        ("Bill Payment Request", "Bill Payment", "Pay my electricity bill for 3000", ["confirm", "bill"]),
+        ("Bill Payment Confirm", "Bill Confirmation", "Yes do it", []),
+    ]),
+    ("[PHASE 6] ACCOUNT CREATION", [
+        ("Create Account", "New Account", "I want to open a new account", ["name"]),
+        ("Provide Name", "Name Input", "My name is Ahmed Hassan", []),
+        ("Provide Phone", "Phone Input", "My phone is 03001234567", []),
+        ("Provide Email", "Email Input", "My email is ahmed@example.com", ["verification", "OTP", "email"]),
+    ]),
+    ("[PHASE 7] CUSTOMER SERVICE", [
+        ("Help Query", "Help Request", "Where can I find the nearest ATM?", ["ATM", "branch"]),
+    ]),
+]
+
+async def send_message(client, msg, session_id, log):
     """Send a message and return response"""
-    global SESSION_ID
     payload = {
         "message": msg,
         "user_id": 1,
-        "session_id": SESSION_ID if SESSION_ID else ""
+        "session_id": session_id if session_id else ""
     }
     
     try:
-        r = requests.post(BASE_URL, json=payload, timeout=5)
-        data = r.json()
-        
-        # Store session ID
-        if 'session_id' in data:
-            SESSION_ID = data['session_id']
-        
-        return data
+        r = await client.post(BASE_URL, json=payload, timeout=5)
+        return r.json()
     except Exception as e:
-        print(f"❌ ERROR: {str(e)}")
+        log(f"❌ ERROR: {str(e)}")
         return None
 
-def test_case(name, message, expected_keywords=None):
-    """Test a single case"""
-    print(f"\n{'='*80}")
-    print(f"TEST: {name}")
-    print(f"USER: {message}")
-    print(f"{'-'*80}")
-    
-    response = send_message(message)
-    if not response:
-        print("❌ No response received!")
-        return False
+async def run_phase(client, title, cases):
+    """Run one phase's turns in order; returns its output lines and results"""
+    lines = []
+    log = lines.append
+    results = []
+    session_id = None
     
-    bot_response = response.get('response', '')
-    intent = response.get('intent', 'N/A')
-    confidence = response.get('confidence', 0)
-    
-    print(f"BOT: {bot_response[:100]}{'...' if len(bot_response) > 100 else ''}")
-    print(f"INTENT: {intent} ({confidence:.1%})")
-    
-    if expected_keywords:
-        found = all(kw.lower() in bot_response.lower() for kw in expected_keywords)
-        if found:
-            print("✅ PASS - Response contains expected keywords")
-            return True
-        else:
-            print(f"❌ FAIL - Expected keywords not found: {expected_keywords}")
-            return False
+    log(f"\n{title}")
+    for result_name, name, message, expected_keywords in cases:
+        log(f"\n{'='*80}")
+        log(f"TEST: {name}")
+        log(f"USER: {message}")
+        log(f"{'-'*80}")
+        
+        response = await send_message(client, message, session_id, log)
+        if not response:
+            log("❌ No response received!")
+            results.append((result_name, False))
+            continue
+        
+        # Store session ID
+        if 'session_id' in response:
+            session_id = response['session_id']
+        
+        bot_response = response.get('response', '')
+        intent = response.get('intent', 'N/A')
+        confidence = response.get('confidence', 0)
+        
+        log(f"BOT: {bot_response[:100]}{'...' if len(bot_response) > 100 else ''}")
+        log(f"INTENT: {intent} ({confidence:.1%})")
+        
+        passed = True
+        if expected_keywords:
+            passed = all(kw.lower() in bot_response.lower() for kw in expected_keywords)
+            if passed:
+                log("✅ PASS - Response contains expected keywords")
+            else:
+                log(f"❌ FAIL - Expected keywords not found: {expected_keywords}")
+        results.append((result_name, passed))
     
-    return True
+    return lines, results
+
+async def run_all():
+    """Run every phase concurrently on one pooled client"""
+    async with async_client() as client:
+        return await asyncio.gather(
+            *(run_phase(client, title, cases) for title, cases in PHASES)
+        )
 
 # ==================== TEST SUITE ====================
 print("\n" + "="*80)
@@ -69,49 +113,10 @@ print("="*80)
 
 results = []
 
-# Test 1: Greeting
-print("\n[PHASE 1] GREETING & SETUP")
-results.append(("Greeting", test_case("Greeting", "Hi there", ["help"])))
-
-# Test 2: Check Balance (no confirmation needed) - Fresh session
-print("\n[PHASE 2] BALANCE INQUIRY")
-SESSION_ID = None  # Reset for new phase
-results.append(("Check Balance", test_case("Check Balance", "What's my account balance?", ["balance", "PKR"])))
-
-# Test 3: Recent Transactions - Fresh session
-print("\n[PHASE 3] TRANSACTION HISTORY")
-SESSION_ID = None  # Reset for new phase
-results.append(("Check Transactions", test_case("Recent Transactions", "Show me my recent transactions", ["transaction"])))
-
-# Test 4: Transfer Money (with confirmation) - Fresh session
-print("\n[PHASE 4] MONEY TRANSFER")
-SESSION_ID = None  # Reset for new phase
-results.append(("Transfer Request", test_case("Transfer Request", "I want to transfer 5000 to Ali", ["account"])))
-time.sleep(1)
-results.append(("Transfer Confirm", test_case("Transfer Confirmation", "Yes, confirm that", [])))
-
-# Test 5: Pay a Bill (with confirmation) - Fresh session
-print("\n[PHASE 5] BILL PAYMENT")
-SESSION_ID = None  # Reset for new phase
-results.append(("Bill Payment Request", test_case("Bill Payment", "Pay my electricity bill for 3000", ["confirm", "bill"])))
-time.sleep(1)
-results.append(("Bill Payment Confirm", test_case("Bill Confirmation", "Yes do it", [])))
-
-# Test 6: Create Account (email verification flow) - Fresh session
-print("\n[PHASE 6] ACCOUNT CREATION")
-SESSION_ID = None  # Reset for new phase
-results.append(("Create Account", test_case("New Account", "I want to open a new account", ["name"])))
-time.sleep(1)
-results.append(("Provide Name", test_case("Name Input", "My name is Ahmed Hassan", [])))
-time.sleep(1)
-results.append(("Provide Phone", test_case("Phone Input", "My phone is 03001234567", [])))
-time.sleep(1)
-results.append(("Provide Email", test_case("Email Input", "My email is ahmed@example.com", ["verification", "OTP", "email"])))
-
-# Test 7: General Help - Fresh session
-print("\n[PHASE 7] CUSTOMER SERVICE")
-SESSION_ID = None  # Reset for new phase
-results.append(("Help Query", test_case("Help Request", "Where can I find the nearest ATM?", ["ATM", "branch"])))
+# Print each phase's transcript in phase order once all have finished
+for lines, phase_results in asyncio.run(run_all()):
+    print("\n".join(lines))
+    results.extend(phase_results)
 
 # ==================== SUMMARY ====================
 print("\n" + "="*80)
@@ -0,0 +1,79 @@
+"""
+Shared pytest fixtures for the root-level chat API tests
+Independent conversations can run in parallel worker processes:
+    pytest -n auto --dist loadgroup quick_test_remapping.py test_action_outputs.py ...
+"""
+import os
+import time
+
+import pytest
+
+from _net import API_BASE, API_HOST, API_PORT, wait_for_port
+
+API_WAIT_SECONDS = float(os.getenv("TEST_API_WAIT", "5"))
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--interactive", action="store_true", default=False,
+        help="run tests that prompt for input such as an emailed OTP (use with -s)"
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "interactive: prompts on stdin; skipped unless --interactive")
+    config.addinivalue_line("markers", "serial: changes shared account state; kept on one xdist worker")
+
+
+def pytest_collection_modifyitems(config, items):
+    run_interactive = config.getoption("--interactive")
+    group_serial = config.pluginmanager.hasplugin("xdist")
+    skip_interactive = pytest.mark.skip(reason="interactive test; pass --interactive -s to run")
+    for item in items:
+        if "interactive" in item.keywords and not run_interactive:
+            item.add_marker(skip_interactive)
+        if "serial" in item.keywords and group_serial:
+            # --dist loadgroup sends every test in a group to the same worker
+            item.add_marker(pytest.mark.xdist_group("serial"))
+
+
+def _wait_until_warm(base_url, timeout):
+    """Poll /health with backoff until the backend reports its models warmed up"""
+    from _http import SESSION
+    deadline = time.monotonic() + timeout
+    delay = 0.1
+    while time.monotonic() < deadline:
+        try:
+            # servers that predate the flag are taken as warm
+            if SESSION.get(f"{base_url}/health", timeout=5).json().get("warm", True):
+                return True
+        except Exception:
+            pass
+        time.sleep(min(delay, max(deadline - time.monotonic(), 0)))
+        delay = min(delay * 2, 2.0)
+    return False
+
+
+@pytest.fixture(scope="session")
+def chat_url():
+    """URL of /api/chat; skips the API tests if the server is not listening"""
+    if not wait_for_port(API_HOST, API_PORT, timeout=API_WAIT_SECONDS):
+        pytest.skip(f"API server not listening on {API_HOST}:{API_PORT}")
+    if not _wait_until_warm(API_BASE, timeout=60):
+        pytest.fail(f"API server at {API_BASE} did not finish warming up")
+    return f"{API_BASE}/api/chat"
+
+
+@pytest.fixture(scope="session")
+def http(chat_url):
+    """Pooled keep-alive session shared by every test in this worker"""
+    from _http import SESSION
+    yield SESSION
+    SESSION.close()
+
+
+@pytest.fixture(scope="session")
+def warm_session_id(http, chat_url):
+    """Chat session opened once with a greeting, shared by read-only tests"""
+    from _http import post_chat
+    return post_chat(http, chat_url, "hello")["session_id"]
@@ -1,9 +1,11 @@
 import requests
 import json
 
+from _net import API_BASE
+
 # Test the chat endpoint
 response = requests.post(
-    'http://localhost:8000/api/chat',
+    f'{API_BASE}/api/chat',
     json={'message': "What's my balance?", 'user_id': 1}
 )
 
@@ -7,19 +7,12 @@ Usage: python launch_app.py [--device windows|web] [--backend-port 8000]
 
 import subprocess
 import time
-import socket
 import sys
 import argparse
 import os
 from pathlib import Path
 
-def is_port_open(host, port):
-    """Check if a port is open"""
-    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    sock.settimeout(1)
-    result = sock.connect_ex((host, port))
-    sock.close()
-    return result == 0
+from _net import is_port_open
 
 def start_backend(backend_port=8000, timeout=30):
     """Start the backend server"""
@@ -39,26 +32,36 @@ def start_backend(backend_port=8000, timeout=30):
     try:
         print(f"🚀 Starting backend on http://127.0.0.1:{backend_port}...")
         
-        # Start backend process
+        # Start backend process. Output is discarded: nothing reads it here, so
+        # pipes would eventually fill and block uvicorn. The backend writes its
+        # own log files under backend/logs.
         backend_process = subprocess.Popen(
             [sys.executable, "-m", "uvicorn", "main:app", 
              "--host", "127.0.0.1", "--port", str(backend_port)],
             cwd=str(backend_dir),
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
             creationflags=subprocess.CREATE_NEW_CONSOLE if sys.platform == "win32" else 0
         )
         
         # Wait for backend to be ready
         print(f"⏳ Waiting for backend to initialize...", end="", flush=True)
         start_time = time.time()
+        next_dot = start_time + 0.5
         
-        while not is_port_open("127.0.0.1", backend_port):
-            if time.time() - start_time > timeout:
+        # Localhost connects answer in microseconds, so poll fast and back
+        # off gently rather than sleeping a fixed half second
+        delay = 0.025
+        while not is_port_open("127.0.0.1", backend_port, timeout=0.1):
+            now = time.time()
+            if now - start_time > timeout:
                 print("\n❌ Backend failed to start within timeout")
                 return False
-            time.sleep(0.5)
-            print(".", end="", flush=True)
+            if now >= next_dot:
+                print(".", end="", flush=True)
+                next_dot = now + 0.5
+            time.sleep(delay)
+            delay = min(delay * 1.3, 0.25)
         
         print(" ✅")
         print(f"✅ Backend ready at http://127.0.0.1:{backend_port}")
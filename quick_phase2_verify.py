@@ -4,10 +4,15 @@ Tests Phase 2 components are properly integrated
 """
 
 import requests
-import json
-import time
+import re
 
-BASE_URL = "http://localhost:8000/api"
+from _http import SESSION
+from _net import API_BASE, API_HOST, API_PORT, wait_for_port
+
+BASE_URL = f"{API_BASE}/api"
+
+# Markers that show the ErrorHandler produced the reply
+_ERR_RE = re.compile(r'(invalid|error|❌)', re.IGNORECASE)
 
 def quick_test():
     print("\n" + "=" * 80)
@@ -17,7 +22,7 @@ def quick_test():
     # Test 1: Health check
     print("\n✅ Test 1: Server Connection")
     try:
-        response = requests.get("http://localhost:8000/docs", timeout=5)
+        response = SESSION.get(f"{API_BASE}/docs", timeout=5)
         if response.status_code == 200:
             print("   ✅ Server is running and accessible")
         else:
@@ -34,7 +39,7 @@ def quick_test():
             "message": "What's my balance?",
             "user_id": 1
         }
-        response = requests.post(f"{BASE_URL}/chat", json=payload, timeout=10)
+        response = SESSION.post(f"{BASE_URL}/chat", json=payload, timeout=10)
         if response.status_code == 200:
             data = response.json()
             msg = data.get("response", "")
@@ -54,12 +59,12 @@ def quick_test():
             "message": "Transfer 10000000 to someone",  # Invalid amount
             "user_id": 1
         }
-        response = requests.post(f"{BASE_URL}/chat", json=payload, timeout=10)
+        response = SESSION.post(f"{BASE_URL}/chat", json=payload, timeout=10)
         if response.status_code == 200:
             data = response.json()
             msg = data.get("response", "")
             # Check if error handler is being used
-            if "invalid" in msg.lower() or "❌" in msg or "error" in msg.lower():
+            if _ERR_RE.search(msg):
                 print("   ✅ Error handling working (ErrorHandler active)")
                 print(f"   Error message: {msg[:80]}...")
             else:
@@ -87,15 +92,17 @@ def quick_test():
 if __name__ == "__main__":
     try:
         print("\nWaiting for server...")
-        for i in range(10):
+        # Cheap TCP probe until the port is up, then one HTTP check that the
+        # FastAPI routes are mounted
+        if wait_for_port(API_HOST, API_PORT, timeout=30):
             try:
-                response = requests.get("http://localhost:8000/docs", timeout=2)
+                response = SESSION.get(f"{API_BASE}/docs", timeout=2)
                 if response.status_code == 200:
                     print("✅ Server is ready!\n")
-                    break
-            except:
-                print(f"  Attempt {i+1}/10...", end="\r")
-                time.sleep(1)
+            except requests.RequestException:
+                pass
+        else:
+            print("  Server port not open after 30s")
         
         success = quick_test()
         exit(0 if success else 1)
@@ -1,18 +1,20 @@
 """Quick test of the account creation flow"""
-import requests
+from _http import SESSION, JSON_HEADERS, chat_body, loads
+from _net import API_BASE
 import time
 
-BASE_URL = "http://localhost:8000"
+BASE_URL = API_BASE
 
 def test_chat(message, session_id=None):
     """Send a chat message and return response"""
     try:
-        resp = requests.post(
+        resp = SESSION.post(
             f"{BASE_URL}/api/chat",
-            json={"message": message, "user_id": 1, "session_id": session_id},
+            data=chat_body(message, session_id),
+            headers=JSON_HEADERS,
             timeout=10
         )
-        data = resp.json()
+        data = loads(resp.content)
         return data
     except Exception as e:
         print(f"Error: {e}")
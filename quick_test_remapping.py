@@ -1,28 +1,42 @@
-import requests
-import time
+"""Balance check with intent remapping, followed by a confirmation turn"""
+from _http import SESSION
+from _net import API_BASE
 
-# Wait for server
-time.sleep(3)
+BASE_URL = f"{API_BASE}/api/chat"
 
-BASE_URL = "http://localhost:8000/api/chat"
 
-print("Testing with remapping...")
-print("="*80)
+def test_balance_remapping(http, chat_url):
+    """'check my balance' is remapped and 'yes' confirms it in the same session"""
+    print("Testing with remapping...")
+    print("="*80)
+    
+    # Both turns go in one /api/chat/batch request; the server keeps them in
+    # one new session, since the confirmation changes its dialogue state
+    r = http.post(f"{chat_url}/batch", json={
+        "messages": ["check my balance", "yes"],
+        "user_id": 1
+    })
+    assert r.status_code == 200
+    batch = r.json()
+    resp1, resp2 = batch["responses"]
+    
+    # Test 1: Check balance
+    print("\n[1] Testing: 'check my balance'")
+    print(f"    Intent (remapped): {resp1.get('intent')}")
+    print(f"    Response: {resp1.get('response')[:60]}...")
+    
+    # Test 2: Confirm
+    print(f"\n[2] Testing confirmation: 'yes' with session {batch['session_id']}")
+    print(f"    Intent: {resp2.get('intent')}")
+    print(f"    Response: {resp2.get('response')[:80]}...")
+    
+    print("\n" + "="*80)
+    print("Test complete!")
 
-# Test 1: Check balance
-print("\n[1] Testing: 'check my balance'")
-r1 = requests.post(BASE_URL, json={"message": "check my balance", "user_id": 1, "session_id": ""})
-resp1 = r1.json()
-print(f"    Intent (remapped): {resp1.get('intent')}")
-print(f"    Response: {resp1.get('response')[:60]}...")
 
-# Test 2: Confirm
-sid = resp1.get('session_id')
-print(f"\n[2] Testing confirmation: 'yes' with session {sid}")
-r2 = requests.post(BASE_URL, json={"message": "yes", "user_id": 1, "session_id": sid})
-resp2 = r2.json()
-print(f"    Intent: {resp2.get('intent')}")
-print(f"    Response: {resp2.get('response')[:80]}...")
-
-print("\n" + "="*80)
-print("Test complete!")
+if __name__ == "__main__":
+    from _net import API_HOST, API_PORT, wait_for_port
+    
+    # Wait for server
+    wait_for_port(API_HOST, API_PORT, timeout=3)
+    test_balance_remapping(SESSION, BASE_URL)
@@ -10,6 +10,7 @@ Run from project root: `python scripts\clear_backend_cache.py`
 import os
 import sys
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 backend_dir = os.path.join(project_root, 'backend')
@@ -21,34 +22,51 @@ if not os.path.isdir(backend_dir):
 removed_count = 0
 removed_items = []
 
-for dirpath, dirnames, filenames in os.walk(backend_dir):
-    # Skip any path that includes 'models' or 'data' to avoid touching trained models or DB files
-    parts = dirpath.split(os.sep)
-    if 'models' in parts or 'data' in parts:
-        continue
-
-    # Remove __pycache__ directories
-    if '__pycache__' in dirnames:
-        cache_path = os.path.join(dirpath, '__pycache__')
-        try:
-            shutil.rmtree(cache_path)
+# Directory names never descended into, to avoid touching trained models or DB files
+PROTECTED_DIRS = ('models', 'data')
+
+cache_dirs = []
+pyc_files = []
+
+
+def scan(path):
+    """Collect __pycache__ dirs and stray .pyc files under path, pruning protected dirs"""
+    with os.scandir(path) as it:
+        for entry in it:
+            # scandir reports the entry type from the directory listing, so no extra stat
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name == '__pycache__':
+                    cache_dirs.append(entry.path)  # removed whole, never walked
+                elif entry.name not in PROTECTED_DIRS:
+                    scan(entry.path)
+            elif entry.name.endswith('.pyc'):
+                pyc_files.append(entry.path)
+
+
+scan(backend_dir)
+
+
+def remove(target):
+    """Delete one cache dir or .pyc file; returns (path, error or None)"""
+    remover, path = target
+    try:
+        remover(path)
+        return path, None
+    except Exception as e:
+        return path, e
+
+
+# Unlinks block in the kernel and release the GIL, so deletions overlap
+# across threads; results come back in order for the report
+targets = [(shutil.rmtree, p) for p in cache_dirs] + [(os.remove, p) for p in pyc_files]
+with ThreadPoolExecutor(max_workers=min(16, (os.cpu_count() or 1) * 2)) as pool:
+    for path, error in pool.map(remove, targets):
+        if error is None:
             removed_count += 1
-            removed_items.append(cache_path)
-            print(f"Removed: {cache_path}")
-        except Exception as e:
-            print(f"Failed to remove {cache_path}: {e}")
-
-    # Remove .pyc files
-    for fname in filenames:
-        if fname.endswith('.pyc'):
-            fpath = os.path.join(dirpath, fname)
-            try:
-                os.remove(fpath)
-                removed_count += 1
-                removed_items.append(fpath)
-                print(f"Removed: {fpath}")
-            except Exception as e:
-                print(f"Failed to remove {fpath}: {e}")
+            removed_items.append(path)
+            print(f"Removed: {path}")
+        else:
+            print(f"Failed to remove {path}: {error}")
 
 print('\nSummary:')
 print(f'  Removed {removed_count} items (pyc/__pycache__) under backend/')
@@ -20,54 +20,53 @@ def seed_demo_data():
     print("SEEDING DEMO DATA")
     print("=" * 70)
     
-    # Create test user
-    user_success, user_msg, user_id = db.create_user(
-        name="John Doe",
-        email="john@example.com",
-        phone="+1234567890"
-    )
-    
-    if user_success:
-        print(f"✓ Created user: {user_id} - {user_msg}")
-    else:
-        print(f"✗ Failed to create user: {user_msg}")
-        return
-    
-    # Create accounts
-    accounts_data = [
-        {'type': 'salary', 'balance': 50000.0},
-        {'type': 'savings', 'balance': 25000.0},
-        {'type': 'current', 'balance': 10000.0},
-    ]
-    
-    account_numbers = []
-    for acc_data in accounts_data:
-        acc_success, acc_msg, account_no = db.create_account(
-            user_id=user_id,
-            account_type=acc_data['type'],
-            initial_balance=acc_data['balance']
+    # All seed writes share one transaction: one write lock and one commit
+    with db.transaction():
+        # Create test user
+        user_success, user_msg, user_id = db.create_user(
+            name="John Doe",
+            email="john@example.com",
+            phone="+1234567890"
         )
         
-        if acc_success:
-            account_numbers.append(account_no)
-            print(f"✓ Created {acc_data['type']} account: {account_no} - Balance: PKR {acc_data['balance']:,.2f}")
+        if user_success:
+            print(f"✓ Created user: {user_id} - {user_msg}")
         else:
-            print(f"✗ Failed to create account: {acc_msg}")
-    
-    # Add sample transactions
-    if len(account_numbers) >= 2:
-        # Transfer from salary to savings
-        transfer_success, transfer_msg = db.execute_transfer(
-            from_account_no=account_numbers[0],
-            to_account_no=account_numbers[1],
-            amount=5000.0,
-            description="Monthly savings transfer"
-        )
+            print(f"✗ Failed to create user: {user_msg}")
+            return
         
-        if transfer_success:
-            print(f"✓ Created sample transaction: {transfer_msg}")
+        # Create accounts
+        accounts_data = [
+            {'type': 'salary', 'balance': 50000.0},
+            {'type': 'savings', 'balance': 25000.0},
+            {'type': 'current', 'balance': 10000.0},
+        ]
+        
+        # One executemany for every account, then one write for the report
+        acc_success, acc_msg, account_numbers = db.create_accounts_bulk(user_id, accounts_data)
+        
+        if acc_success:
+            sys.stdout.write("\n".join(
+                f"✓ Created {acc_data['type']} account: {account_no} - Balance: PKR {acc_data['balance']:,.2f}"
+                for acc_data, account_no in zip(accounts_data, account_numbers)
+            ) + "\n")
         else:
-            print(f"✗ Failed to create transaction: {transfer_msg}")
+            print(f"✗ Failed to create accounts: {acc_msg}")
+        
+        # Add sample transactions
+        if len(account_numbers) >= 2:
+            # Transfer from salary to savings
+            transfer_success, transfer_msg = db.execute_transfer(
+                from_account_no=account_numbers[0],
+                to_account_no=account_numbers[1],
+                amount=5000.0,
+                description="Monthly savings transfer"
+            )
+        
+            if transfer_success:
+                print(f"✓ Created sample transaction: {transfer_msg}")
+            else:
+                print(f"✗ Failed to create transaction: {transfer_msg}")
     
     print("=" * 70)
     print("DEMO DATA SEEDED SUCCESSFULLY")
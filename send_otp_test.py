@@ -9,19 +9,38 @@ in backend code — keep them here in tests.
 Usage:
   python send_otp_test.py                # sends to default apexwolf993@gmail.com
   python send_otp_test.py user@example.com
+  python send_otp_test.py a@example.com b@example.com   # several, sent in parallel
   SMTP credentials are read from env vars or the email service defaults.
 """
 import sys
-from app.auth.auth_manager import AuthManager
+import functools
+from concurrent.futures import ThreadPoolExecutor
 
 DEFAULT_RECIPIENT = "apexwolf993@gmail.com"
 
+@functools.lru_cache(maxsize=1)
+def get_auth_manager():
+    """Import and build the AuthManager on first use, then reuse it"""
+    from app.auth.auth_manager import AuthManager
+    return AuthManager()  # Uses EmailService defaults/environment
+
+def send_otp(recipient):
+    """Send one account-creation OTP and return (success, message)"""
+    return get_auth_manager().initiate_email_verification(recipient, 'account_creation')
+
 def main():
-    recipient = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_RECIPIENT
-    print(f"Sending OTP to: {recipient}")
-    am = AuthManager()  # Uses EmailService defaults/environment
-    success, message = am.initiate_email_verification(recipient, 'account_creation')
-    print("Result:", success, message)
+    recipients = sys.argv[1:] or [DEFAULT_RECIPIENT]
+    for recipient in recipients:
+        print(f"Sending OTP to: {recipient}")
+    get_auth_manager()  # build once up front, before any worker threads
+    if len(recipients) == 1:
+        success, message = send_otp(recipients[0])
+        print("Result:", success, message)
+        return
+    # SMTP submission is network-bound, so send to several recipients at once
+    with ThreadPoolExecutor(max_workers=min(8, len(recipients))) as pool:
+        for recipient, (success, message) in zip(recipients, pool.map(send_otp, recipients)):
+            print(f"Result ({recipient}):", success, message)
 
 if __name__ == '__main__':
     main()
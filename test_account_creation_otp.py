@@ -5,18 +5,28 @@ Target email: apexwolf993@gmail.com
 """
 
 import requests
-import json
+from _http import SESSION
+from _mail import IMAP_HOST, imap_configured, wait_for_otp
+from _net import API_BASE
+import os
+import re
+import sys
 import time
 from typing import Optional, Dict, Any
 
 # Configuration
-API_BASE_URL = "http://localhost:8000"
+API_BASE_URL = API_BASE
 USER_ID = 1
 TEST_EMAIL = "apexwolf993@gmail.com"
 TEST_NAME = "Test User"
 TEST_PHONE = "03001234567"
 TEST_ACCOUNT_TYPE = "savings"
 
+# Response checks, compiled once
+OTP_RE = re.compile(r"\d{6}")
+VERIFIED_RE = re.compile(r"verified", re.I)
+CREATED_RE = re.compile(r"account created|successfully", re.I)
+
 # Colors for terminal output
 class Colors:
     HEADER = '\033[95m'
@@ -28,26 +38,42 @@ class Colors:
     END = '\033[0m'
     BOLD = '\033[1m'
 
+# No escape codes in redirected output or when NO_COLOR is set
+if not sys.stdout.isatty() or os.getenv("NO_COLOR"):
+    for _name in [k for k in vars(Colors) if not k.startswith('_')]:
+        setattr(Colors, _name, "")
+
+# Line templates, with the color codes joined once at import
+HEADER_TMPL = Colors.BOLD + Colors.HEADER + "{:^80}" + Colors.END
+STEP_TMPL = Colors.BOLD + Colors.CYAN + "Step {}: {}" + Colors.END
+SUCCESS_TMPL = Colors.GREEN + "✅ {}" + Colors.END
+INFO_TMPL = Colors.BLUE + "ℹ️  {}" + Colors.END
+WARNING_TMPL = Colors.YELLOW + "⚠️  {}" + Colors.END
+ERROR_TMPL = Colors.RED + "❌ {}" + Colors.END
+SEP = "=" * 80
+SUB_SEP = "-" * 80
+HEADER_RULE = HEADER_TMPL.format(SEP)
+
 def print_header(text):
-    print(f"\n{Colors.BOLD}{Colors.HEADER}{'=' * 80}{Colors.END}")
-    print(f"{Colors.BOLD}{Colors.HEADER}{text:^80}{Colors.END}")
-    print(f"{Colors.BOLD}{Colors.HEADER}{'=' * 80}{Colors.END}\n")
+    print(f"\n{HEADER_RULE}\n{HEADER_TMPL.format(text)}\n{HEADER_RULE}\n")
 
 def print_step(step_num, description):
-    print(f"{Colors.BOLD}{Colors.CYAN}Step {step_num}: {description}{Colors.END}")
-    print("-" * 80)
+    # Piped stdout is block-buffered; push out the previous step's lines
+    # here so CI logs still show progress one step at a time
+    sys.stdout.flush()
+    print(f"{STEP_TMPL.format(step_num, description)}\n{SUB_SEP}")
 
 def print_success(message):
-    print(f"{Colors.GREEN}✅ {message}{Colors.END}")
+    print(SUCCESS_TMPL.format(message))
 
 def print_info(message):
-    print(f"{Colors.BLUE}ℹ️  {message}{Colors.END}")
+    print(INFO_TMPL.format(message))
 
 def print_warning(message):
-    print(f"{Colors.YELLOW}⚠️  {message}{Colors.END}")
+    print(WARNING_TMPL.format(message))
 
 def print_error(message):
-    print(f"{Colors.RED}❌ {message}{Colors.END}")
+    print(ERROR_TMPL.format(message))
 
 def send_chat_message(message: str, session_id: Optional[str] = None) -> Dict[Any, Any]:
     """Send a message to the chat API"""
@@ -58,7 +84,7 @@ def send_chat_message(message: str, session_id: Optional[str] = None) -> Dict[An
     }
     
     try:
-        response = requests.post(
+        response = SESSION.post(
             f"{API_BASE_URL}/api/chat",
             json=payload,
             timeout=10
@@ -134,6 +160,7 @@ def main():
     print_warning(f"📧 Watch for OTP email to arrive at {TEST_EMAIL}!")
     time.sleep(1)
     
+    requested_at = time.time()
     response = send_chat_message(TEST_EMAIL, session_id)
     if not response:
         print_error("Failed to get response")
@@ -145,13 +172,20 @@ def main():
     
     # Step 5: Wait for OTP and get it from user
     print_step(5, "Email Verification with OTP")
-    print_warning(f"⏳ Check your email ({TEST_EMAIL}) for the OTP code...")
-    print_info("The OTP is a 6-digit number. You have 5 minutes to use it.")
-    
-    # Get OTP from user
-    otp_code = input(f"\n{Colors.BOLD}Enter the 6-digit OTP from your email: {Colors.END}").strip()
-    
-    if not otp_code or len(otp_code) != 6 or not otp_code.isdigit():
+    otp_code = None
+    if imap_configured():
+        # Read the OTP straight from the test mailbox
+        print_info(f"Waiting on {IMAP_HOST} for the OTP email...")
+        otp_code = wait_for_otp(requested_at, float(os.getenv("TEST_OTP_WAIT", "30")))
+    
+    if not otp_code:
+        print_warning(f"⏳ Check your email ({TEST_EMAIL}) for the OTP code...")
+        print_info("The OTP is a 6-digit number. You have 5 minutes to use it.")
+        
+        # Get OTP from user
+        otp_code = input(f"\n{Colors.BOLD}Enter the 6-digit OTP from your email: {Colors.END}").strip()
+    
+    if not OTP_RE.fullmatch(otp_code):
         print_error("Invalid OTP format. OTP must be 6 digits.")
         return
     
@@ -166,7 +200,7 @@ def main():
     bot_response = response.get('response', '')
     
     # Check if OTP verification was successful
-    if "verified" in bot_response.lower() or "email verified" in bot_response.lower():
+    if VERIFIED_RE.search(bot_response):
         print_success("Email verified successfully!")
         print(f"Bot: {Colors.BOLD}{bot_response}{Colors.END}\n")
     else:
@@ -208,14 +242,10 @@ def main():
     # Final summary
     print_header("ACCOUNT CREATION TEST COMPLETE! 🎉")
     
-    if "account created" in bot_response.lower() or "successfully" in bot_response.lower():
+    if CREATED_RE.search(bot_response):
         print_success("✅ ACCOUNT CREATION SUCCESSFUL!")
         print(f"\nFinal Response:\n{Colors.BOLD}{bot_response}{Colors.END}")
-        print("\n" + "=" * 80)
-        print(f"Session ID: {session_id}")
-        print(f"User ID: {USER_ID}")
-        print(f"Email: {TEST_EMAIL}")
-        print("=" * 80)
+        print(f"\n{SEP}\nSession ID: {session_id}\nUser ID: {USER_ID}\nEmail: {TEST_EMAIL}\n{SEP}")
     else:
         print_warning("Response indicates potential issues. Check the output above.")
         print(f"\nFinal Response:\n{Colors.BOLD}{bot_response}{Colors.END}")
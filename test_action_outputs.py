@@ -1,69 +1,121 @@
-import requests
-import json
-
-BASE_URL = "http://localhost:8000/api/chat"
-
-test_cases = [
-    ("hello", "Greeting"),
-    ("check my balance", "Check Balance"),
-    ("yes", "Confirmation - Balance"),
-    ("transfer 100 to john", "Transfer Money"),
-    ("yes", "Confirmation - Transfer"),
-    ("pay my electricity bill", "Bill Payment"),
-    ("yes", "Confirmation - Bill"),
+import asyncio
+
+import pytest
+
+from _http import JSON_HEADERS, async_client, chat_body, loads, post_chat, pretty
+from _net import API_BASE
+
+BASE_URL = f"{API_BASE}/api/chat"
+
+# Each chain runs in its own chat session: chains run concurrently, while
+# a chain's turns (trigger, then confirmation) stay in order
+test_chains = [
+    [("hello", "Greeting")],
+    [("check my balance", "Check Balance"),
+     ("yes", "Confirmation - Balance")],
+    [("transfer 100 to john", "Transfer Money"),
+     ("yes", "Confirmation - Transfer")],
+    [("pay my electricity bill", "Bill Payment"),
+     ("yes", "Confirmation - Bill")],
 ]
 
-session_id = None
+# Chains whose confirmation moves user 1's money; under pytest-xdist they
+# share one worker so their balance checks don't race each other
+SERIAL_CHAINS = {"Transfer Money", "Bill Payment"}
+
+# Chains that leave the dialogue state as they found it run in the worker's
+# shared warm session; any chain with a confirmation turn changes that
+# state, so it opens a session of its own
+READ_ONLY_CHAINS = {"Greeting"}
 
-print("="*80)
-print("COMPREHENSIVE ACTION OUTPUT TEST")
-print("="*80)
 
-for message, test_name in test_cases:
-    print(f"\n[TEST] {test_name}: '{message}'")
-    print("-" * 80)
+def describe(data, log):
+    """Log the fields of one chat response"""
+    log(f"Session ID: {data.get('session_id', 'N/A')}")
+    log(f"Intent: {data.get('intent', 'N/A')}")
+    log(f"Confidence: {data.get('confidence', 'N/A')}")
+    log(f"Status: {data.get('status', 'N/A')}")
+    log(f"\nResponse:")
+    log(f"  {data.get('response', 'N/A')}")
     
-    payload = {
-        "message": message,
-        "user_id": 1,
-        "session_id": session_id if session_id else ""
-    }
+    # Check for additional fields
+    if 'action_output' in data:
+        log(f"\nAction Output:")
+        log(f"  {data['action_output']}")
     
-    try:
-        response = requests.post(BASE_URL, json=payload, timeout=10)
-        data = response.json()
+    if 'receipt' in data:
+        log(f"\nReceipt:")
+        log(pretty(data['receipt']))
         
-        # Store session ID for continuation
-        if not session_id and 'session_id' in data:
-            session_id = data['session_id']
-        
-        print(f"Status Code: {response.status_code}")
-        print(f"Session ID: {data.get('session_id', 'N/A')}")
-        print(f"Intent: {data.get('intent', 'N/A')}")
-        print(f"Confidence: {data.get('confidence', 'N/A')}")
-        print(f"Status: {data.get('status', 'N/A')}")
-        print(f"\nResponse:")
-        print(f"  {data.get('response', 'N/A')}")
+    if 'balance' in data:
+        log(f"\nBalance:")
+        log(f"  {data['balance']}")
+
+
+async def run_chain(client, chain):
+    """Run one chain's turns in order and return its output lines"""
+    lines = []
+    log = lines.append
+    session_id = None
+    
+    for message, test_name in chain:
+        log(f"\n[TEST] {test_name}: '{message}'")
+        log("-" * 80)
         
-        # Check for additional fields
-        if 'action_output' in data:
-            print(f"\nAction Output:")
-            print(f"  {data['action_output']}")
+        body = chat_body(message, session_id if session_id else "")
         
-        if 'receipt' in data:
-            print(f"\nReceipt:")
-            print(json.dumps(data['receipt'], indent=2))
+        try:
+            response = await client.post(BASE_URL, content=body, headers=JSON_HEADERS)
+            data = loads(response.content)
             
-        if 'balance' in data:
-            print(f"\nBalance:")
-            print(f"  {data['balance']}")
+            # Store session ID for continuation
+            if not session_id and 'session_id' in data:
+                session_id = data['session_id']
             
-    except Exception as e:
-        print(f"ERROR: {str(e)}")
-        session_id = None  # Reset on error
+            log(f"Status Code: {response.status_code}")
+            describe(data, log)
+                
+        except Exception as e:
+            log(f"ERROR: {str(e)}")
+            session_id = None  # Reset on error
+        
+        log("-" * 80)
     
-    print("-" * 80)
+    return lines
+
+
+async def run_all():
+    """Run every chain concurrently on one pooled client"""
+    async with async_client(timeout=30.0, max_connections=100) as client:
+        return await asyncio.gather(*(run_chain(client, chain) for chain in test_chains))
+
 
-print("\n" + "="*80)
-print("TEST COMPLETE")
-print("="*80)
+@pytest.mark.parametrize("chain", [
+    pytest.param(chain, id=chain[0][1],
+                 marks=[pytest.mark.serial] if chain[0][1] in SERIAL_CHAINS else [])
+    for chain in test_chains
+])
+def test_action_chain(http, chat_url, request, chain):
+    """Each turn of the chain succeeds within one session"""
+    session_id = None
+    if chain[0][1] in READ_ONLY_CHAINS:
+        session_id = request.getfixturevalue("warm_session_id")
+    for message, test_name in chain:
+        print(f"\n[TEST] {test_name}: '{message}'")
+        data = post_chat(http, chat_url, message, session_id, timeout=30)
+        session_id = session_id or data.get('session_id')
+        describe(data, print)
+
+
+if __name__ == "__main__":
+    print("="*80)
+    print("COMPREHENSIVE ACTION OUTPUT TEST")
+    print("="*80)
+    
+    # Print each chain's transcript in order once all have finished
+    for lines in asyncio.run(run_all()):
+        print("\n".join(lines))
+    
+    print("\n" + "="*80)
+    print("TEST COMPLETE")
+    print("="*80)
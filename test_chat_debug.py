@@ -1,9 +1,20 @@
-import requests
+from _http import SESSION
+from _net import API_BASE
 import json
 
-response = requests.post('http://localhost:8000/api/chat', 
-    json={'message': "What's my balance?", 'user_id': 1})
+BASE_URL = f'{API_BASE}/api/chat'
 
-print(f'Status Code: {response.status_code}')
-print(f'Response:')
-print(json.dumps(response.json(), indent=2))
+
+def test_chat_debug(http, chat_url):
+    """Print the full /api/chat payload for a balance question"""
+    response = http.post(chat_url, 
+        json={'message': "What's my balance?", 'user_id': 1})
+    
+    print(f'Status Code: {response.status_code}')
+    print(f'Response:')
+    print(json.dumps(response.json(), indent=2))
+    assert response.status_code == 200
+
+
+if __name__ == "__main__":
+    test_chat_debug(SESSION, BASE_URL)
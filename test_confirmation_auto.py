@@ -1,8 +1,15 @@
 """
 Test account creation confirmation with auto OTP entry
-Waits a few seconds to allow user to check email and get the OTP
+Waits on the test mailbox for the OTP when TEST_IMAP_* is configured,
+otherwise asks for it on stdin
 """
-import requests
+from _http import SESSION, JSON_HEADERS, chat_body, loads
+from _mail import IMAP_HOST, imap_configured, wait_for_otp
+from _net import API_BASE
+import functools
+import os
+import pytest
+import re
 import time
 import sys
 from typing import Dict, Any
@@ -11,24 +18,41 @@ from typing import Dict, Any
 if sys.stdout.encoding != 'utf-8':
     sys.stdout.reconfigure(encoding='utf-8')
 
-BASE_URL = "http://localhost:8000/api/chat"
+BASE_URL = f"{API_BASE}/api/chat"
+
+# URL, headers and timeout bound once for every chat turn
+POST = functools.partial(SESSION.post, BASE_URL, headers=JSON_HEADERS, timeout=10)
+TEST_EMAIL = "apexwolf993@gmail.com"
+
+# Optional pause between steps; zero by default so CI runs back to back
+SETTLE = float(os.getenv("TEST_SETTLE", "0"))
+OTP_WAIT_SECONDS = float(os.getenv("TEST_OTP_WAIT", "30"))
+
+# Response checks, each one case-insensitive pass over the text
+OTP_RE = re.compile(r"\d{6}")
+VERIFIED_RE = re.compile(r"successfully|verified", re.I)
+INVALID_RE = re.compile(r"invalid", re.I)
+CONFIRM_PROMPT_RE = re.compile(r"please confirm|yes/no|confirm:", re.I)
+LOOP_RE = re.compile(r"please confirm", re.I)
+CREATED_RE = re.compile(r"successfully|receipt|account.*created|created.*account", re.I | re.S)
+
+
+def settle():
+    """Pause between steps only when TEST_SETTLE asks for it"""
+    if SETTLE:
+        time.sleep(SETTLE)
 
 def send_message(message: str, session_id: str = None) -> Dict[str, Any]:
     """Send a message and return response"""
-    payload = {
-        "message": message,
-        "user_id": 1,
-        "session_id": session_id
-    }
-    
     try:
-        response = requests.post(BASE_URL, json=payload, timeout=10)
-        data = response.json()
+        response = POST(data=chat_body(message, session_id))
+        data = loads(response.content)
         return data
     except Exception as e:
         print(f"ERROR: {e}")
         return {}
 
+@pytest.mark.interactive
 def test():
     """Test account creation confirmation flow"""
     print("\n" + "="*80)
@@ -42,39 +66,38 @@ def test():
     resp = send_message("Create an account", session_id)
     session_id = resp.get('session_id')
     print(f"    Response: {resp.get('response', 'N/A')[:80]}")
-    time.sleep(0.5)
+    settle()
     
     # Step 2: Name
     print("\n[2] Provide name...")
     resp = send_message("Test User Flow", session_id)
     print(f"    Response: {resp.get('response', 'N/A')[:80]}")
-    time.sleep(0.5)
+    settle()
     
     # Step 3: Phone
     print("\n[3] Provide phone...")
     resp = send_message("03001234567", session_id)
     print(f"    Response: {resp.get('response', 'N/A')[:80]}")
-    time.sleep(0.5)
+    settle()
     
     # Step 4: Email - use the real test email
-    print("\n[4] Provide email (apexwolf993@gmail.com)...")
-    resp = send_message("apexwolf993@gmail.com", session_id)
+    print(f"\n[4] Provide email ({TEST_EMAIL})...")
+    requested_at = time.time()
+    resp = send_message(TEST_EMAIL, session_id)
     resp_text = resp.get('response', '')
     print(f"    Response: {resp_text[:80]}")
-    print("    [INFO] Waiting 10 seconds for OTP email...")
-    
-    # Wait for OTP to be sent and user to check email
-    for i in range(10, 0, -1):
-        print(f"    [{i}] Checking email...", end='\r')
-        time.sleep(1)
-    print("\n    [INFO] Please manually check your email and enter OTP below")
-    print("    [INFO] If no OTP received, check spam folder or use 'resend'")
-    time.sleep(1)
     
-    # Step 5: Get OTP from user
-    print("\n[5] Enter the OTP from your email:")
-    otp = input("    OTP (6 digits): ").strip()
-    if not otp.isdigit() or len(otp) != 6:
+    # Step 5: Get OTP from the mailbox, or from the user if no mailbox is configured
+    otp = None
+    if imap_configured():
+        print(f"    [INFO] Waiting on {IMAP_HOST} for the OTP email (up to {OTP_WAIT_SECONDS:.0f}s)...")
+        otp = wait_for_otp(requested_at, OTP_WAIT_SECONDS)
+    if not otp:
+        print("    [INFO] Please manually check your email and enter OTP below")
+        print("    [INFO] If no OTP received, check spam folder or use 'resend'")
+        print("\n[5] Enter the OTP from your email:")
+        otp = input("    OTP (6 digits): ").strip()
+    if not OTP_RE.fullmatch(otp):
         print("    [ERROR] Invalid OTP format")
         return False
     
@@ -84,8 +107,8 @@ def test():
     print(f"    Response: {resp_text[:100]}")
     
     # Check if OTP was verified
-    if "successfully" not in resp_text.lower() and "verified" not in resp_text.lower():
-        if "invalid" in resp_text.lower():
+    if not VERIFIED_RE.search(resp_text):
+        if INVALID_RE.search(resp_text):
             print("    [ERROR] OTP verification failed - invalid code")
             return False
         else:
@@ -93,7 +116,7 @@ def test():
     else:
         print("    [GOOD] OTP verified!")
     
-    time.sleep(0.5)
+    settle()
     
     # Step 6: Account type
     print("\n[6] Provide account type (savings)...")
@@ -102,14 +125,13 @@ def test():
     print(f"    Response: {resp_text[:100]}")
     
     # Check if confirmation is pending now
-    conf_text = resp_text.lower()
-    if "please confirm" in conf_text or "yes/no" in conf_text or "confirm:" in conf_text:
+    if CONFIRM_PROMPT_RE.search(resp_text):
         print("    [GOOD] Confirmation prompt detected!")
     else:
         print(f"    [WARNING] No confirmation prompt - response was: {resp_text[:100]}")
         return False
     
-    time.sleep(0.5)
+    settle()
     
     # Step 7: Say YES
     print("\n[7] Send YES to confirmation...")
@@ -120,12 +142,11 @@ def test():
     print(f"    State intent after YES: {state_intent}")
     
     # Check for loop or success
-    resp_lower = resp_text.lower()
-    if "please confirm" in resp_lower:
+    if LOOP_RE.search(resp_text):
         print("\n[FAIL] Still showing confirmation - LOOP DETECTED!")
         print(f"    Full response: {resp_text}")
         return False
-    elif "successfully" in resp_lower or ("account" in resp_lower and "created" in resp_lower) or "receipt" in resp_lower:
+    elif CREATED_RE.search(resp_text):
         print("\n[SUCCESS] Account created successfully!")
         print(f"    Full response:\n{resp_text}")
         return True
@@ -1,4 +1,7 @@
-import requests
+from _http import SESSION
+from _net import API_BASE
+
+BASE_URL = f'{API_BASE}/api/chat'
 
 tests = [
     ('check fees', ''),
@@ -7,11 +10,18 @@ tests = [
     ('bye', ''),
 ]
 
-sid = None
-for msg, _ in tests:
-    r = requests.post('http://localhost:8000/api/chat', json={'message': msg, 'user_id': 1, 'session_id': sid if sid else ''})
-    resp = r.json()
-    if not sid:
-        sid = resp['session_id']
-    resp_text = resp['response'][:60]
-    print(f'{msg:20} -> {resp_text}...')
+
+def test_confirmation_extended(http, chat_url):
+    """Non-transactional turns around a confirmation stay in one session"""
+    # The turns don't branch on replies, so they go in one batch request
+    r = http.post(f"{chat_url}/batch", json={'messages': [msg for msg, _ in tests], 'user_id': 1, 'session_id': ''})
+    assert r.status_code == 200
+    responses = r.json()['responses']
+    assert len(responses) == len(tests)
+    for (msg, _), resp in zip(tests, responses):
+        resp_text = resp['response'][:60]
+        print(f'{msg:20} -> {resp_text}...')
+
+
+if __name__ == "__main__":
+    test_confirmation_extended(SESSION, BASE_URL)
@@ -1,110 +1,210 @@
 """
 Test script to debug the confirmation loop issue during account creation
-Run: python test_confirmation_flow.py
+Run: python test_confirmation_flow.py [concurrent_flows] [--record | --replay]
+
+--record saves each flow's responses under fixtures/, and --replay plays
+them back instead of calling the server, so the state-machine checks can
+run offline. A fixture is named by a hash of the flow's messages, so
+changing any message needs a fresh recording.
+
+A replay only re-checks what was recorded; it never contacts the server,
+so it says nothing about the backend as it is now and is reported as a
+replay rather than a pass.
 """
-import requests
-import time
-import json
+import asyncio
+import hashlib
+import os
+import sys
 from typing import Dict, Any
 
-BASE_URL = "http://localhost:8000/api/chat"
+import httpx
 
-def send_message(message: str, session_id: str = None) -> Dict[str, Any]:
-    """Send a message to the chatbot and return the response"""
-    payload = {
-        "message": message,
-        "user_id": 1,
-        "session_id": session_id
-    }
+from _http import JSON_HEADERS, async_client, chat_body, dumps, loads, pretty
+from _log import log
+from _net import API_BASE
+
+BASE_URL = f"{API_BASE}/api/chat"
+
+# Banner rules
+SEP = "=" * 80
+
+RECORD = "--record" in sys.argv
+REPLAY = "--replay" in sys.argv
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def flow_messages(flow: int = 0) -> list:
+    """The turns of one flow in order; the phone is distinct per concurrent flow"""
+    return ["I want to create an account", "Ahmed Hassan", f"0300{1234567 + flow:07d}",
+            "ahmed.test@example.com", "123456", "savings", "yes", "hello"]
+
+
+def fixture_path(messages) -> str:
+    """Recording for one conversation, keyed by its messages"""
+    key = hashlib.sha256("|".join(messages).encode()).hexdigest()[:12]
+    return os.path.join(FIXTURE_DIR, f"happy_path_{key}.json")
+
+
+class Tape:
+    """
+    Stands in for the httpx client during one flow
+    
+    Records each response when RECORD is set; with REPLAY, answers every
+    post from the recording in order without touching the network.
+    """
+    
+    def __init__(self, client: httpx.AsyncClient, path: str):
+        self.client = client
+        self.path = path
+        self.responses = []
+        if REPLAY:
+            with open(path, "rb") as f:
+                self.responses = loads(f.read())
+    
+    async def post(self, url, **kwargs) -> httpx.Response:
+        if REPLAY:
+            return httpx.Response(200, content=dumps(self.responses.pop(0)),
+                                  request=httpx.Request("POST", url))
+        response = await self.client.post(url, **kwargs)
+        # Fail on error pages before decoding them, like send_message does
+        response.raise_for_status()
+        self.responses.append(loads(response.content))
+        return response
     
-    print(f"\n{'='*80}")
-    print(f"[SEND] {message}")
-    print(f"{'='*80}")
+    def save(self):
+        os.makedirs(FIXTURE_DIR, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(pretty(self.responses) + "\n")
+
+async def send_message(client: httpx.AsyncClient, message: str, session_id: str = None,
+                       say=log.info) -> Dict[str, Any]:
+    """Send a message to the chatbot and return the response"""
+    say("\n" + SEP)
+    say("[SEND] %s", message)
+    say(SEP)
     
     try:
-        response = requests.post(BASE_URL, json=payload, timeout=10)
+        response = await client.post(BASE_URL, content=chat_body(message, session_id),
+                                     headers=JSON_HEADERS)
         response.raise_for_status()
-        data = response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"[ERROR] Request failed: {e}")
-        print(f"[STATUS] {response.status_code if 'response' in locals() else 'N/A'}")
+        data = loads(response.content)
+    except httpx.HTTPError as e:
+        say("[ERROR] Request failed: %s", e)
+        say("[STATUS] %s", response.status_code if 'response' in locals() else 'N/A')
         return {}
     
-    print(f"[RESPONSE] {data.get('response', 'N/A')}")
-    print(f"[INTENT] {data.get('debug_state_intent', 'N/A')}")
-    print(f"[STATUS] {data.get('status', 'N/A')}")
+    say("[RESPONSE] %s", data.get('response', 'N/A'))
+    say("[INTENT] %s", data.get('debug_state_intent', 'N/A'))
+    say("[STATUS] %s", data.get('status', 'N/A'))
     
     return data
 
-def test_confirmation_loop():
-    """Test the account creation confirmation loop"""
-    print("\n" + "="*80)
-    print("TEST: Account Creation Confirmation Loop")
-    print("="*80)
-    
+async def confirmation_loop_flow(client: httpx.AsyncClient, flow: int = 0, say=log.info) -> bool:
+    """Walk one account creation through confirmation and check it doesn't loop"""
+    say("\n" + SEP)
+    say("TEST: Account Creation Confirmation Loop%s", f" (flow {flow})" if flow else "")
+    say(SEP)
+    
+    opener, name, phone, email, otp, account_type, confirm, follow_up = messages = flow_messages(flow)
+    if RECORD or REPLAY:
+        client = Tape(client, fixture_path(messages))
     session_id = None
     
     # Step 1: Start account creation
-    print("\n[STEP 1] Starting account creation...")
-    response = send_message("I want to create an account", session_id)
+    say("\n[STEP 1] Starting account creation...")
+    response = await send_message(client, opener, session_id, say)
     session_id = response.get('session_id')
     
     # Step 2: Provide name
-    print("\n[STEP 2] Providing name...")
-    response = send_message("Ahmed Hassan", session_id)
+    say("\n[STEP 2] Providing name...")
+    response = await send_message(client, name, session_id, say)
     
-    # Step 3: Provide phone
-    print("\n[STEP 3] Providing phone number...")
-    response = send_message("03001234567", session_id)
+    # Step 3: Provide phone (distinct per concurrent flow)
+    say("\n[STEP 3] Providing phone number...")
+    response = await send_message(client, phone, session_id, say)
     
     # Step 4: Provide email
-    print("\n[STEP 4] Providing email...")
-    response = send_message("ahmed.test@example.com", session_id)
-    time.sleep(2)  # Wait for OTP to be sent
+    say("\n[STEP 4] Providing email...")
+    response = await send_message(client, email, session_id, say)
+    if not REPLAY:
+        await asyncio.sleep(2)  # Wait for OTP to be sent
     
     # Step 5: Provide OTP (mock OTP, should fail but that's okay for this test)
-    print("\n[STEP 5] Providing OTP...")
-    response = send_message("123456", session_id)
+    say("\n[STEP 5] Providing OTP...")
+    response = await send_message(client, otp, session_id, say)
     
     # Step 6: Provide account type
-    print("\n[STEP 6] Providing account type...")
-    response = send_message("savings", session_id)
+    say("\n[STEP 6] Providing account type...")
+    response = await send_message(client, account_type, session_id, say)
     
     # Step 7: First confirmation (say YES)
-    print("\n[STEP 7] First confirmation (YES)...")
-    response = send_message("yes", session_id)
+    say("\n[STEP 7] First confirmation (YES)...")
+    response = await send_message(client, confirm, session_id, say)
     
     # Track the response to check for loop
-    print(f"\n[AFTER YES]")
-    print(f"   Response: {response.get('response', 'N/A')}")
-    print(f"   State Intent: {response.get('debug_state_intent', 'N/A')}")
+    say("\n[AFTER YES]")
+    say("   Response: %s", response.get('response', 'N/A'))
+    say("   State Intent: %s", response.get('debug_state_intent', 'N/A'))
     
     # Step 8: Send another message (should NOT repeat confirmation)
-    print("\n[STEP 8] Sending another message after confirmation...")
-    response = send_message("hello", session_id)
-    
-    print(f"\n[AFTER HELLO]")
-    print(f"   Response: {response.get('response', 'N/A')}")
-    print(f"   State Intent: {response.get('debug_state_intent', 'N/A')}")
+    say("\n[STEP 8] Sending another message after confirmation...")
+    response = await send_message(client, follow_up, session_id, say)
+    
+    say("\n[AFTER HELLO]")
+    say("   Response: %s", response.get('response', 'N/A'))
+    say("   State Intent: %s", response.get('debug_state_intent', 'N/A'))
+    
+    if RECORD:
+        # A turn that failed left a gap, and replaying a short tape would
+        # hand later turns the wrong responses
+        if len(client.responses) == len(messages):
+            client.save()
+        else:
+            say("\n[RECORD] Not saved: %d of %d turns failed", len(messages) - len(client.responses), len(messages))
     
     # Check if we're stuck in confirmation loop
     if "Please confirm" in response.get('response', ''):
-        print("\n[ERROR] Still in confirmation loop!")
+        say("\n[ERROR] Still in confirmation loop!")
         return False
     else:
-        print("\n[SUCCESS] Confirmation loop handled correctly!")
+        say("\n[SUCCESS] Confirmation loop handled correctly!")
         return True
 
+async def main(flows: int = 1) -> bool:
+    """Run `flows` independent sessions concurrently on one pooled client"""
+    async with async_client(max_connections=32, max_keepalive_connections=32, keepalive_expiry=30) as client:
+        if flows == 1:
+            return await confirmation_loop_flow(client)
+        
+        # Buffer each flow's log records so interleaved sessions print one at a time
+        transcripts = [[] for _ in range(flows)]
+        results = await asyncio.gather(*(
+            confirmation_loop_flow(client, i, lambda msg, *args, lines=lines: lines.append((msg, args)))
+            for i, lines in enumerate(transcripts)
+        ))
+        for lines in transcripts:
+            for msg, args in lines:
+                log.info(msg, *args)
+        log.warning(f"\n{sum(results)}/{flows} flows passed")
+        return all(results)
+
+def test_confirmation_loop():
+    """Test the account creation confirmation loop"""
+    return asyncio.run(main())
+
 if __name__ == "__main__":
     try:
-        success = test_confirmation_loop()
-        print("\n" + "="*80)
-        if success:
-            print("[PASS] TEST PASSED")
+        args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+        success = asyncio.run(main(int(args[0]) if args else 1))
+        log.warning("\n" + SEP)
+        if success and REPLAY:
+            log.warning("[REPLAY] Recorded responses still pass the checks (server not contacted)")
+        elif success:
+            log.warning("[PASS] TEST PASSED")
         else:
-            print("[FAIL] TEST FAILED - Confirmation loop detected")
-        print("="*80)
+            log.warning("[FAIL] TEST FAILED - Confirmation loop detected")
+        log.warning(SEP)
     except Exception as e:
-        print(f"\n[ERROR] Test error: {e}")
+        log.error(f"\n[ERROR] Test error: {e}")
         import traceback
         traceback.print_exc()
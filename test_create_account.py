@@ -1,46 +1,49 @@
-import requests
-import json
-
-print("=" * 80)
-print("Testing Create Account Feature")
-print("=" * 80)
-
-# Test 1: Create account request
-print("\n✅ Test 1: Create Savings Account")
-print("-" * 80)
-
-response = requests.post('http://localhost:8000/api/chat', 
-    json={'message': 'I want to create a savings account', 'user_id': 1})
-
-data = response.json()
-print(f"User: I want to create a savings account")
-print(f"Bot: {data['response']}")
-print(f"Intent: {data['intent']}")
-print(f"Requires Input: {data['requires_input']}")
-
-# Test 2: Create current account
-print("\n✅ Test 2: Create Current Account")
-print("-" * 80)
-
-response = requests.post('http://localhost:8000/api/chat', 
-    json={'message': 'Create a current account for me', 'user_id': 2})
-
-data = response.json()
-print(f"User: Create a current account for me")
-print(f"Bot: {data['response']}")
-print(f"Intent: {data['intent']}")
-
-# Test 3: Invalid account type
-print("\n✅ Test 3: Invalid Account Type")
-print("-" * 80)
-
-response = requests.post('http://localhost:8000/api/chat', 
-    json={'message': 'Create a crypto account', 'user_id': 1})
-
-data = response.json()
-print(f"User: Create a crypto account")
-print(f"Bot: {data['response']}")
-
-print("\n" + "=" * 80)
-print("Testing Complete!")
-print("=" * 80)
+from concurrent.futures import ThreadPoolExecutor
+
+from _http import SESSION, post_chat
+from _log import log
+from _net import API_BASE
+
+BASE_URL = f"{API_BASE}/api/chat"
+
+# Banner rules
+SEP = "=" * 80
+SUB_SEP = "-" * 80
+
+# (title, message, user_id, response fields printed after the bot reply);
+# the cases are independent, so they are sent concurrently
+cases = [
+    ("Test 1: Create Savings Account", "I want to create a savings account", 1,
+     (("Intent", "intent"), ("Requires Input", "requires_input"))),
+    ("Test 2: Create Current Account", "Create a current account for me", 2,
+     (("Intent", "intent"),)),
+    ("Test 3: Invalid Account Type", "Create a crypto account", 1,
+     ()),
+]
+
+
+def run(case):
+    """Send one case's message and return the decoded response"""
+    _, message, user_id, _ = case
+    return post_chat(SESSION, BASE_URL, message, user_id=user_id)
+
+
+log.info(SEP)
+log.info("Testing Create Account Feature")
+log.info(SEP)
+
+with ThreadPoolExecutor(max_workers=len(cases)) as ex:
+    results = list(ex.map(run, cases))
+
+# Report in case order once every response is in
+for (title, message, _, fields), data in zip(cases, results):
+    log.info("\n✅ %s", title)
+    log.info(SUB_SEP)
+    log.info("User: %s", message)
+    log.warning(f"Bot: {data['response']}")
+    for label, key in fields:
+        log.warning(f"{label}: {data[key]}")
+
+log.info("\n" + SEP)
+log.info("Testing Complete!")
+log.info(SEP)
@@ -1,19 +1,13 @@
 #!/usr/bin/env python3
-import requests
-import json
+from _http import SESSION, post_chat
+from _net import API_BASE
 
-BASE_URL = "http://localhost:8000/api/chat"
+BASE_URL = f"{API_BASE}/api/chat"
 SESSION_ID = None
 
 def send_msg(msg):
     global SESSION_ID
-    payload = {
-        "message": msg,
-        "user_id": 1,
-        "session_id": SESSION_ID if SESSION_ID else ""
-    }
-    r = requests.post(BASE_URL, json=payload, timeout=10)
-    data = r.json()
+    data = post_chat(SESSION, BASE_URL, msg, SESSION_ID)
     if "session_id" in data:
         SESSION_ID = data["session_id"]
     return data
@@ -1,118 +1,147 @@
 """
 Simple test for the confirmation loop issue - no Unicode/emoji
 """
-import requests
+from _http import SESSION, JSON_HEADERS, chat_body, loads
+from _log import log
+from _mail import IMAP_HOST, imap_configured, wait_for_otp
+from _net import API_BASE
+import functools
 import time
-import json
+import os
+import re
 import sys
 from typing import Dict, Any
 
+try:
+    import pytest
+except ImportError:  # optional: only needed to mark the test when run under pytest
+    pytest = None
+
 # Set UTF-8 encoding for terminal output
 if sys.stdout.encoding != 'utf-8':
     sys.stdout.reconfigure(encoding='utf-8')
 
-BASE_URL = "http://localhost:8000/api/chat"
+BASE_URL = f"{API_BASE}/api/chat"
+
+# Banner rules
+SEP = "=" * 80
+
+# URL, headers and timeout bound once for every chat turn
+POST = functools.partial(SESSION.post, BASE_URL, headers=JSON_HEADERS, timeout=10)
+
+# OTP format check, compiled once
+OTP_RE = re.compile(r"\d{6}")
+
+# Only needs a human at the keyboard when the OTP can't be read from the mailbox
+if pytest is not None and not imap_configured():
+    pytestmark = pytest.mark.interactive
 
 def send_message(message: str, session_id: str = None) -> Dict[str, Any]:
     """Send a message and return response"""
-    payload = {
-        "message": message,
-        "user_id": 1,
-        "session_id": session_id
-    }
-    
     try:
-        response = requests.post(BASE_URL, json=payload, timeout=10)
-        data = response.json()
+        response = POST(data=chat_body(message, session_id))
+        data = loads(response.content)
         return data
     except Exception as e:
-        print(f"ERROR: {e}")
+        log.error(f"ERROR: {e}")
         return {}
 
 def test():
     """Test account creation confirmation flow"""
-    print("\n" + "="*80)
-    print("TEST: Account Creation Confirmation Loop")
-    print("="*80)
+    log.info("\n" + SEP)
+    log.info("TEST: Account Creation Confirmation Loop")
+    log.info(SEP)
     
     session_id = None
     
     # Step 1: Start account creation
-    print("\n[1] Create account intent...")
+    log.info("\n[1] Create account intent...")
     resp = send_message("Create an account", session_id)
     session_id = resp.get('session_id')
-    print(f"    Response: {resp.get('response', 'N/A')[:80]}")
+    log.info("    Response: %.80s", resp.get('response', 'N/A'))
     
     # Step 2: Name
-    print("\n[2] Provide name...")
+    log.info("\n[2] Provide name...")
     resp = send_message("Test User Flow", session_id)
-    print(f"    Response: {resp.get('response', 'N/A')[:80]}")
+    log.info("    Response: %.80s", resp.get('response', 'N/A'))
     
     # Step 3: Phone
-    print("\n[3] Provide phone...")
+    log.info("\n[3] Provide phone...")
     resp = send_message("03001234567", session_id)
-    print(f"    Response: {resp.get('response', 'N/A')[:80]}")
+    log.info("    Response: %.80s", resp.get('response', 'N/A'))
     
     # Step 4: Email - use the real test email
-    print("\n[4] Provide email (apexwolf993@gmail.com)...")
+    log.info("\n[4] Provide email (apexwolf993@gmail.com)...")
+    requested_at = time.time()
     resp = send_message("apexwolf993@gmail.com", session_id)
-    print(f"    Response: {resp.get('response', 'N/A')[:80]}")
-    print("    [INFO] OTP has been sent to apexwolf993@gmail.com")
-    print("    [INFO] Check your email for the 6-digit code")
-    time.sleep(2)
+    log.info("    Response: %.80s", resp.get('response', 'N/A'))
+    log.info("    [INFO] OTP has been sent to apexwolf993@gmail.com")
     
-    # Step 5: Get OTP from user
-    print("\n[5] Enter the OTP from your email:")
-    otp = input("    OTP (6 digits): ").strip()
-    if not otp.isdigit() or len(otp) != 6:
-        print("    [ERROR] Invalid OTP format")
+    # Step 5: Read the OTP from the test mailbox, or ask for it
+    if imap_configured():
+        wait = float(os.getenv("TEST_OTP_WAIT", "30"))
+        log.info("\n[5] Waiting on %s for the OTP email...", IMAP_HOST)
+        otp = wait_for_otp(requested_at, wait)
+        if not otp:
+            # Unattended run: nobody is there to type the code in
+            reason = f"no OTP email arrived on {IMAP_HOST} within {wait:.0f}s"
+            if os.getenv("PYTEST_CURRENT_TEST"):
+                pytest.skip(reason)
+            log.error(f"    [ERROR] {reason}")
+            return False
+    else:
+        print("    [INFO] Check your email for the 6-digit code")
+        print("\n[5] Enter the OTP from your email:")
+        otp = input("    OTP (6 digits): ").strip()
+    if not OTP_RE.fullmatch(otp):
+        log.error("    [ERROR] Invalid OTP format")
         return False
     
-    print(f"\n[5b] Verify OTP ({otp})...")
+    log.info("\n[5b] Verify OTP (%s)...", otp)
     resp = send_message(otp, session_id)
-    print(f"    Response: {resp.get('response', 'N/A')[:100]}")
+    log.info("    Response: %.100s", resp.get('response', 'N/A'))
     
     # Check if OTP was verified
     if "successfully" not in resp.get('response', '').lower() and "verified" not in resp.get('response', '').lower():
-        print("    [ERROR] OTP verification failed")
+        log.error("    [ERROR] OTP verification failed")
         return False
     
     # Step 6: Account type
-    print("\n[6] Provide account type (savings)...")
+    log.info("\n[6] Provide account type (savings)...")
     resp = send_message("savings", session_id)
-    print(f"    Response: {resp.get('response', 'N/A')[:100]}")
+    log.info("    Response: %.100s", resp.get('response', 'N/A'))
     
     # Check if confirmation is pending now
     conf_text = resp.get('response', '').lower()
     if "please confirm" in conf_text or "yes/no" in conf_text or "confirm:" in conf_text:
-        print("    [GOOD] Confirmation prompt detected!")
+        log.info("    [GOOD] Confirmation prompt detected!")
     else:
-        print(f"    [WARNING] No confirmation prompt - response was: {resp.get('response', '')[:100]}")
+        log.warning(f"    [WARNING] No confirmation prompt - response was: {resp.get('response', '')[:100]}")
         return False
     
     # Step 7: Say YES
-    print("\n[7] Send YES to confirmation...")
+    log.info("\n[7] Send YES to confirmation...")
     resp = send_message("yes", session_id)
-    print(f"    Response: {resp.get('response', 'N/A')[:150]}")
-    print(f"    State intent after YES: {resp.get('debug_state_intent', 'N/A')}")
+    log.info("    Response: %.150s", resp.get('response', 'N/A'))
+    log.info("    State intent after YES: %s", resp.get('debug_state_intent', 'N/A'))
     
     # Check for loop
     resp_lower = resp.get('response', '').lower()
     if "please confirm" in resp_lower:
-        print("\n[FAIL] Still showing confirmation - LOOP DETECTED!")
+        log.warning("\n[FAIL] Still showing confirmation - LOOP DETECTED!")
         return False
     elif "successfully" in resp_lower or "account created" in resp_lower or "account" in resp_lower and "created" in resp_lower:
-        print("\n[PASS] Account created successfully!")
+        log.warning("\n[PASS] Account created successfully!")
         return True
     else:
-        print(f"\n[UNKNOWN] Unexpected response: {resp.get('response', '')[:100]}")
+        log.warning(f"\n[UNKNOWN] Unexpected response: {resp.get('response', '')[:100]}")
         return False
 
 if __name__ == "__main__":
     success = test()
-    print("\n" + "="*80)
+    log.warning("\n" + SEP)
     if success:
-        print("RESULT: PASS")
+        log.warning("RESULT: PASS")
     else:
-        print("RESULT: FAIL or UNKNOWN")
-    print("="*80)
+        log.warning("RESULT: FAIL or UNKNOWN")
+    log.warning(SEP)
@@ -1,53 +1,75 @@
 """
 Minimal Diagnostic Test
-Tests individual endpoints one at a time to identify which one causes the shutdown
+Probes each endpoint one at a time to identify which one causes the shutdown
 """
 
-import requests
 import time
 
-BASE_URL = "http://localhost:8000"
+import requests
+
+from _log import log
+from _net import API_BASE
+
+BASE_URL = API_BASE
 
-print("\n" + "="*80)
-print("MINIMAL DIAGNOSTIC TEST")
-print("="*80)
+# Banner rules
+SEP = "=" * 80
 
-# Test 1: Check server is alive
-print("\n[TEST 1] Server Health (/docs)")
-try:
-    response = requests.get(f"{BASE_URL}/docs", timeout=5)
-    print(f"✅ Status: {response.status_code}")
-except Exception as e:
-    print(f"❌ Error: {e}")
-    exit(1)
+# Seconds between probes, so a crash shows up against the probe that caused it
+PROBE_PAUSE = 1
 
-time.sleep(1)
+# No retries: a failing endpoint is exactly what this script looks for
+session = requests.Session()
 
-# Test 2: Check chat endpoint with simple input
-print("\n[TEST 2] Chat Endpoint (/api/chat) - Simple Message")
-try:
+
+def check_health():
+    response = session.get(f"{BASE_URL}/docs", timeout=5)
+    return [f"✅ Status: {response.status_code}"]
+
+
+def check_chat():
     payload = {
         "message": "Hello",
         "user_id": 1,
         "session_id": "test_001"
     }
-    response = requests.post(f"{BASE_URL}/api/chat", json=payload, timeout=10)
-    print(f"✅ Status: {response.status_code}")
+    response = session.post(f"{BASE_URL}/api/chat", json=payload, timeout=10)
+    lines = [f"✅ Status: {response.status_code}"]
     if response.status_code == 200:
-        print(f"✅ Response: {response.json().get('response', '')[:100]}")
-except Exception as e:
-    print(f"❌ Error: {e}")
-
-time.sleep(1)
-
-# Test 3: Check balance endpoint
-print("\n[TEST 3] Balance Endpoint (/api/balance/1)")
-try:
-    response = requests.get(f"{BASE_URL}/api/balance/1", timeout=5)
-    print(f"✅ Status: {response.status_code}")
-except Exception as e:
-    print(f"❌ Error: {e}")
-
-print("\n" + "="*80)
-print("TEST COMPLETE")
-print("="*80 + "\n")
+        lines.append(f"✅ Response: {response.json().get('response', '')[:100]}")
+    return lines
+
+
+def check_balance():
+    response = session.get(f"{BASE_URL}/api/balance/1", timeout=5)
+    return [f"✅ Status: {response.status_code}"]
+
+
+PROBES = [
+    ("[TEST 1] Server Health (/docs)", check_health),
+    ("[TEST 2] Chat Endpoint (/api/chat) - Simple Message", check_chat),
+    ("[TEST 3] Balance Endpoint (/api/balance/1)", check_balance),
+]
+
+log.info("\n" + SEP)
+log.info("MINIMAL DIAGNOSTIC TEST")
+log.info(SEP)
+
+for i, (title, probe) in enumerate(PROBES):
+    if i:
+        time.sleep(PROBE_PAUSE)
+    log.warning(f"\n{title}")
+    try:
+        log.warning("\n".join(probe()))
+    except Exception as e:
+        log.error(f"❌ Error: {e}")
+        # Without the server health check the other results mean nothing
+        if probe is check_health:
+            session.close()
+            exit(1)
+
+session.close()
+
+log.info("\n" + SEP)
+log.info("TEST COMPLETE")
+log.info(SEP + "\n")
@@ -2,32 +2,112 @@
 Phase 2 Integration Test
 Tests receipt generation, error handling, and entity validation
 Place in: test_phase2.py (project root)
+Run: python test_phase2.py [--only receipt|error|validator|integration]
+ or: pytest test_phase2.py -n auto (each validation case is its own test)
 """
 
+import argparse
+import functools
 import os
 import sys
 
-# Add paths for imports
-app_dir = os.path.join(os.path.dirname(__file__), 'backend', 'app')
-sys.path.insert(0, app_dir)
-sys.path.insert(0, os.path.dirname(__file__))
+try:
+    import pytest
+except ImportError:  # optional: only needed for the per-case pytest tests
+    pytest = None
 
-from backend.app.utils.receipt_generator import ReceiptGenerator
-from backend.app.utils.error_handler import ErrorHandler
-from backend.app.ml.entity_validator import EntityValidator
+
+def _setup_paths():
+    """Put the project root, backend and backend/app on sys.path, once per process"""
+    root = os.path.dirname(__file__)
+    for path in (os.path.join(root, 'backend', 'app'), os.path.join(root, 'backend'), root):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+
+_setup_paths()
+
+from _log import log
+
+# Let the Windows console coalesce writes instead of flushing every line
+if sys.platform == "win32":
+    sys.stdout.reconfigure(line_buffering=False, write_through=False)
+
+
+# Banner rules
+SEP = "=" * 80
+SUB_SEP = "-" * 80
+
+
+@functools.lru_cache(maxsize=None)
+def shared(cls):
+    """One instance per helper class, built on first use and shared by the tests"""
+    return cls()
+
+
+# Entity kind -> (value, should_pass) cases, shared by test_entity_validator
+# and the per-case test_validation_case
+VALIDATION_CASES = {
+    "amount": [
+        ("5000", True),
+        ("5000.50", True),
+        ("PKR 5000", True),
+        ("1,000,000", True),
+        (2500000, False),  # Exceeds MAX_AMOUNT
+        (-500, False),      # Negative
+        ("abc", False),     # Invalid
+    ],
+    "account_number": [
+        ("PK12ABCD1234567890123456", True),  # Valid IBAN
+        ("123456789012", True),                 # Valid account
+        ("PK12ABC", False),                     # Too short
+        ("INVALID", False),                     # Invalid format
+    ],
+    "phone_number": [
+        ("03001234567", True),   # Valid Pakistani
+        ("03211234567", True),   # Valid Pakistani
+        ("03451234567", True),   # Valid Pakistani
+        ("+923001234567", True),  # Valid with country code
+        ("0300123", False),       # Too short
+        ("0200123456", False),    # Invalid operator
+    ],
+    "person": [
+        ("Ali Khan", True),      # Valid
+        ("Sarah Ahmed", True),   # Valid
+        ("John-Paul", True),     # Valid with hyphen
+        ("A", False),            # Too short
+        ("123ABC", False),       # Invalid characters
+    ],
+    "bill_type": [
+        ("electricity", True),
+        ("mobile", True),
+        ("gas", True),
+        ("water", True),
+        ("internet", True),
+        ("credit_card", True),
+        ("loan", True),
+        ("invalid_bill", False),
+    ],
+}
+
+
+def write_block(text):
+    """Log a multi-line block as a single record"""
+    log.info("%s", text)
 
 
 def test_receipt_generator():
     """Test receipt generation for all transaction types"""
-    print("\n" + "=" * 80)
-    print(" " * 15 + "🧾 PHASE 2: RECEIPT GENERATOR TESTS")
-    print("=" * 80)
+    from backend.app.utils.receipt_generator import ReceiptGenerator
+    generator = shared(ReceiptGenerator)
     
-    generator = ReceiptGenerator()
+    log.info("\n" + SEP)
+    log.info(" " * 15 + "🧾 PHASE 2: RECEIPT GENERATOR TESTS")
+    log.info(SEP)
     
     # Test 1: Transfer Receipt (Text Format)
-    print("\n✅ Test 1: Transfer Receipt (Text Format)")
-    print("-" * 80)
+    log.info("\n✅ Test 1: Transfer Receipt (Text Format)")
+    log.info(SUB_SEP)
     transfer_receipt = generator.generate_transfer_receipt(
         transaction_id="TXN-20241206-001234",
         from_account={
@@ -45,11 +125,11 @@ def test_receipt_generator():
         new_balance=120450.00,
         format="text"
     )
-    print(transfer_receipt)
+    write_block(transfer_receipt)
     
     # Test 2: Bill Payment Receipt (Text)
-    print("\n\n✅ Test 2: Bill Payment Receipt (Text Format)")
-    print("-" * 80)
+    log.info("\n\n✅ Test 2: Bill Payment Receipt (Text Format)")
+    log.info(SUB_SEP)
     bill_receipt = generator.generate_bill_payment_receipt(
         transaction_id="BILL-20241206-005678",
         bill_type="electricity",
@@ -64,11 +144,11 @@ def test_receipt_generator():
         new_balance=121250.00,
         format="text"
     )
-    print(bill_receipt)
+    write_block(bill_receipt)
     
     # Test 3: Account Creation Receipt
-    print("\n\n✅ Test 3: Account Creation Receipt")
-    print("-" * 80)
+    log.info("\n\n✅ Test 3: Account Creation Receipt")
+    log.info(SUB_SEP)
     account_receipt = generator.generate_account_creation_receipt(
         user_name="Ahmed Ali",
         phone="03001234567",
@@ -77,22 +157,24 @@ def test_receipt_generator():
         account_type="savings",
         format="text"
     )
-    print(account_receipt)
+    write_block(account_receipt)
     
-    print("\n" + "✅ Receipt Generator Tests: PASSED")
+    log.warning("\n" + "✅ Receipt Generator Tests: PASSED")
+    sys.stdout.flush()
 
 
 def test_error_handler():
     """Test error handling for various scenarios"""
-    print("\n" + "=" * 80)
-    print(" " * 15 + "⚠️  PHASE 2: ERROR HANDLER TESTS")
-    print("=" * 80)
+    from backend.app.utils.error_handler import ErrorHandler
+    handler = shared(ErrorHandler)
     
-    handler = ErrorHandler()
+    log.info("\n" + SEP)
+    log.info(" " * 15 + "⚠️  PHASE 2: ERROR HANDLER TESTS")
+    log.info(SEP)
     
     # Test 1: Insufficient Balance
-    print("\n✅ Test 1: Insufficient Balance Error")
-    print("-" * 80)
+    log.info("\n✅ Test 1: Insufficient Balance Error")
+    log.info(SUB_SEP)
     error = handler.insufficient_balance_error(
         required=5000.00,
         available=3200.00,
@@ -101,11 +183,11 @@ def test_error_handler():
             {'account_type': 'current', 'balance': 12000.00}
         ]
     )
-    print(error)
+    write_block(error)
     
     # Test 2: Invalid Account
-    print("\n\n✅ Test 2: Invalid Account Error")
-    print("-" * 80)
+    log.info("\n\n✅ Test 2: Invalid Account Error")
+    log.info(SUB_SEP)
     error = handler.invalid_account_error(
         entered_account="PK12ABC",
         user_accounts=[
@@ -113,141 +195,92 @@ def test_error_handler():
             {'account_no': 'PK12ABCD1234567890123457', 'account_type': 'savings'}
         ]
     )
-    print(error)
+    write_block(error)
     
     # Test 3: Amount Out of Range
-    print("\n\n✅ Test 3: Amount Out of Range Error")
-    print("-" * 80)
+    log.info("\n\n✅ Test 3: Amount Out of Range Error")
+    log.info(SUB_SEP)
     error = handler.amount_out_of_range_error(
         amount=2500000.00,
         min_amount=1.00,
         max_amount=1000000.00
     )
-    print(error)
+    write_block(error)
     
     # Test 4: Invalid Phone
-    print("\n\n✅ Test 4: Invalid Phone Error")
-    print("-" * 80)
+    log.info("\n\n✅ Test 4: Invalid Phone Error")
+    log.info(SUB_SEP)
     error = handler.invalid_phone_error("0300123")
-    print(error)
+    write_block(error)
     
     # Test 5: Invalid Email
-    print("\n\n✅ Test 5: Invalid Email Error")
-    print("-" * 80)
+    log.info("\n\n✅ Test 5: Invalid Email Error")
+    log.info(SUB_SEP)
     error = handler.invalid_email_error("notanemail")
-    print(error)
+    write_block(error)
     
     # Test 6: Email Already Exists
-    print("\n\n✅ Test 6: Email Already Exists Error")
-    print("-" * 80)
+    log.info("\n\n✅ Test 6: Email Already Exists Error")
+    log.info(SUB_SEP)
     error = handler.email_already_exists_error("user@gmail.com")
-    print(error)
+    write_block(error)
     
     # Test 7: OTP Error
-    print("\n\n✅ Test 7: OTP Verification Error")
-    print("-" * 80)
+    log.info("\n\n✅ Test 7: OTP Verification Error")
+    log.info(SUB_SEP)
     error = handler.otp_error(attempts_remaining=2)
-    print(error)
+    write_block(error)
     
-    print("\n" + "✅ Error Handler Tests: PASSED")
+    log.warning("\n" + "✅ Error Handler Tests: PASSED")
+    sys.stdout.flush()
+
+
+def print_batch(validator, kind, cases):
+    """Validate (value, should_pass) cases in one batch and print them in one write"""
+    results = validator.validate_batch(kind, [value for value, _ in cases])
+    log.warning("\n".join(
+        f"  {'✅' if (result is not None) == should_pass else '❌'} {value} -> {result}"
+        for (value, should_pass), result in zip(cases, results)
+    ))
 
 
 def test_entity_validator():
     """Test entity validation"""
-    print("\n" + "=" * 80)
-    print(" " * 15 + "✔️  PHASE 2: ENTITY VALIDATOR TESTS")
-    print("=" * 80)
+    from backend.app.ml.entity_validator import EntityValidator
+    validator = shared(EntityValidator)
     
-    validator = EntityValidator()
+    log.info("\n" + SEP)
+    log.info(" " * 15 + "✔️  PHASE 2: ENTITY VALIDATOR TESTS")
+    log.info(SEP)
     
     # Test 1: Valid Amount
-    print("\n✅ Test 1: Amount Validation")
-    print("-" * 80)
-    tests = [
-        ("5000", True),
-        ("5000.50", True),
-        ("PKR 5000", True),
-        ("1,000,000", True),
-        (2500000, False),  # Exceeds MAX_AMOUNT
-        (-500, False),      # Negative
-        ("abc", False),     # Invalid
-    ]
-    
-    for amount, should_pass in tests:
-        result = validator.validate_amount(amount)
-        status = "✅" if (result is not None) == should_pass else "❌"
-        print(f"  {status} {amount} -> {result}")
+    log.info("\n✅ Test 1: Amount Validation")
+    log.info(SUB_SEP)
+    print_batch(validator, "amount", VALIDATION_CASES["amount"])
     
     # Test 2: Account Number Validation
-    print("\n\n✅ Test 2: Account Number Validation")
-    print("-" * 80)
-    account_tests = [
-        ("PK12ABCD1234567890123456", True),  # Valid IBAN
-        ("123456789012", True),                 # Valid account
-        ("PK12ABC", False),                     # Too short
-        ("INVALID", False),                     # Invalid format
-    ]
-    
-    for account, should_pass in account_tests:
-        result = validator.validate_account_number(account)
-        status = "✅" if (result is not None) == should_pass else "❌"
-        print(f"  {status} {account} -> {result}")
+    log.info("\n\n✅ Test 2: Account Number Validation")
+    log.info(SUB_SEP)
+    print_batch(validator, "account_number", VALIDATION_CASES["account_number"])
     
     # Test 3: Phone Number Validation
-    print("\n\n✅ Test 3: Phone Number Validation")
-    print("-" * 80)
-    phone_tests = [
-        ("03001234567", True),   # Valid Pakistani
-        ("03211234567", True),   # Valid Pakistani
-        ("03451234567", True),   # Valid Pakistani
-        ("+923001234567", True),  # Valid with country code
-        ("0300123", False),       # Too short
-        ("0200123456", False),    # Invalid operator
-    ]
-    
-    for phone, should_pass in phone_tests:
-        result = validator.validate_phone_number(phone)
-        status = "✅" if (result is not None) == should_pass else "❌"
-        print(f"  {status} {phone} -> {result}")
+    log.info("\n\n✅ Test 3: Phone Number Validation")
+    log.info(SUB_SEP)
+    print_batch(validator, "phone_number", VALIDATION_CASES["phone_number"])
     
     # Test 4: Person Name Validation
-    print("\n\n✅ Test 4: Person Name Validation")
-    print("-" * 80)
-    name_tests = [
-        ("Ali Khan", True),      # Valid
-        ("Sarah Ahmed", True),   # Valid
-        ("John-Paul", True),     # Valid with hyphen
-        ("A", False),            # Too short
-        ("123ABC", False),       # Invalid characters
-    ]
-    
-    for name, should_pass in name_tests:
-        result = validator.validate_person_name(name)
-        status = "✅" if (result is not None) == should_pass else "❌"
-        print(f"  {status} {name} -> {result}")
+    log.info("\n\n✅ Test 4: Person Name Validation")
+    log.info(SUB_SEP)
+    print_batch(validator, "person", VALIDATION_CASES["person"])
     
     # Test 5: Bill Type Validation
-    print("\n\n✅ Test 5: Bill Type Validation")
-    print("-" * 80)
-    bill_tests = [
-        ("electricity", True),
-        ("mobile", True),
-        ("gas", True),
-        ("water", True),
-        ("internet", True),
-        ("credit_card", True),
-        ("loan", True),
-        ("invalid_bill", False),
-    ]
-    
-    for bill_type, should_pass in bill_tests:
-        result = validator.validate_bill_type(bill_type)
-        status = "✅" if (result is not None) == should_pass else "❌"
-        print(f"  {status} {bill_type} -> {result}")
+    log.info("\n\n✅ Test 5: Bill Type Validation")
+    log.info(SUB_SEP)
+    print_batch(validator, "bill_type", VALIDATION_CASES["bill_type"])
     
     # Test 6: Validate Entities Dictionary
-    print("\n\n✅ Test 6: Validate Entities Dictionary")
-    print("-" * 80)
+    log.info("\n\n✅ Test 6: Validate Entities Dictionary")
+    log.info(SUB_SEP)
     entities = {
         'amount': '5000',
         'account_number': 'PK12ABCD1234567890123456',
@@ -257,13 +290,13 @@ def test_entity_validator():
     }
     
     validated = validator.validate_entities(entities)
-    print("  Validated entities:")
+    log.info("  Validated entities:")
     for key, value in validated.items():
-        print(f"    • {key}: {value}")
+        log.info("    • %s: %s", key, value)
     
     # Test 7: Get Validation Errors
-    print("\n\n✅ Test 7: Get Validation Errors")
-    print("-" * 80)
+    log.info("\n\n✅ Test 7: Get Validation Errors")
+    log.info(SUB_SEP)
     invalid_entities = {
         'amount': '2500000',  # Too large
         'account_number': 'INVALID',
@@ -271,34 +304,66 @@ def test_entity_validator():
     }
     
     errors = validator.get_validation_errors(invalid_entities)
-    print("  Validation errors found:")
+    log.info("  Validation errors found:")
     for error in errors:
-        print(f"    • {error}")
+        log.info("    • %s", error)
     
-    print("\n" + "✅ Entity Validator Tests: PASSED")
+    log.warning("\n" + "✅ Entity Validator Tests: PASSED")
+
+
+if pytest is not None:
+    @pytest.fixture(scope="session")
+    def validator():
+        """The shared EntityValidator, for the per-case tests"""
+        from backend.app.ml.entity_validator import EntityValidator
+        return shared(EntityValidator)
+    
+    @pytest.mark.parametrize("kind, value, should_pass", [
+        pytest.param(kind, value, should_pass, id=f"{kind}-{value}")
+        for kind, cases in VALIDATION_CASES.items()
+        for value, should_pass in cases
+    ])
+    def test_validation_case(validator, kind, value, should_pass):
+        """Each validation case is accepted or rejected as expected"""
+        result, = validator.validate_batch(kind, [value])
+        assert (result is not None) == should_pass, f"{kind} {value!r} -> {result!r}"
+
+
+def test_json_receipt_non_ascii():
+    """JSON receipts escape non-ASCII names and keep their field order"""
+    import json
+    from backend.app.utils import receipt_generator as rg
+    values = ("REG-20241206-0001", "2024-12-06T10:00:00", "account_creation", "success",
+              {"name": "Ali Khän 😀"}, {"account_type": "savings"})
+    encoded = rg._encode_receipt(rg._ACCOUNT_RECEIPT_KEYS, values)
+    assert "Kh\\u00e4n \\ud83d\\ude00" in encoded
+    assert tuple(json.loads(encoded)["receipt"]) == rg._ACCOUNT_RECEIPT_KEYS
 
 
 def test_integration():
     """Test integration of all Phase 2 components"""
-    print("\n" + "=" * 80)
-    print(" " * 15 + "🔗 PHASE 2: INTEGRATION TESTS")
-    print("=" * 80)
+    from backend.app.utils.receipt_generator import ReceiptGenerator
+    from backend.app.utils.error_handler import ErrorHandler
+    from backend.app.ml.entity_validator import EntityValidator
+    generator = shared(ReceiptGenerator)
+    handler = shared(ErrorHandler)
+    validator = shared(EntityValidator)
     
-    generator = ReceiptGenerator()
-    handler = ErrorHandler()
-    validator = EntityValidator()
+    log.info("\n" + SEP)
+    log.info(" " * 15 + "🔗 PHASE 2: INTEGRATION TESTS")
+    log.info(SEP)
     
     # Test 1: Full Transfer Workflow
-    print("\n✅ Test 1: Full Transfer Workflow")
-    print("-" * 80)
+    log.info("\n✅ Test 1: Full Transfer Workflow")
+    log.info(SUB_SEP)
     
     # Validate amount
     amount = "5000"
     validated_amount = validator.validate_amount(amount)
     if validated_amount:
-        print(f"  ✅ Amount validation: {amount} -> {validated_amount}")
+        log.warning(f"  ✅ Amount validation: {amount} -> {validated_amount}")
     else:
-        print(f"  ❌ Amount validation failed: {amount}")
+        log.warning(f"  ❌ Amount validation failed: {amount}")
         return
     
     # Validate accounts
@@ -309,9 +374,9 @@ def test_integration():
     validated_to = validator.validate_account_number(to_account)
     
     if validated_from and validated_to:
-        print(f"  ✅ Account validation: Both accounts valid")
+        log.warning(f"  ✅ Account validation: Both accounts valid")
     else:
-        print(f"  ❌ Account validation failed")
+        log.warning(f"  ❌ Account validation failed")
         return
     
     # Generate receipt
@@ -332,11 +397,11 @@ def test_integration():
         new_balance=120450.00,
         format="text"
     )
-    print(f"  ✅ Receipt generated (lines: {len(receipt.split(chr(10)))})")
+    log.warning(f"  ✅ Receipt generated (lines: {len(receipt.split(chr(10)))})")
     
     # Test 2: Error Handling with Validation
-    print("\n\n✅ Test 2: Error Handling Integration")
-    print("-" * 80)
+    log.info("\n\n✅ Test 2: Error Handling Integration")
+    log.info(SUB_SEP)
     
     # Invalid amount
     invalid_amount = "2500000"
@@ -347,45 +412,57 @@ def test_integration():
             min_amount=validator.MIN_AMOUNT,
             max_amount=validator.MAX_AMOUNT
         )
-        print(f"  ✅ Invalid amount caught and error generated")
-        print(f"  Error: {error_msg[:60]}...")
+        log.warning(f"  ✅ Invalid amount caught and error generated")
+        log.info("  Error: %.60s...", error_msg)
     
     # Invalid phone
     invalid_phone = "0200123456"
     validated = validator.validate_phone_number(invalid_phone)
     if not validated:
         error_msg = handler.invalid_phone_error(invalid_phone)
-        print(f"  ✅ Invalid phone caught and error generated")
+        log.warning(f"  ✅ Invalid phone caught and error generated")
     
-    print("\n" + "✅ Integration Tests: PASSED")
+    log.warning("\n" + "✅ Integration Tests: PASSED")
+    sys.stdout.flush()
+
 
+# --only name -> test; each test imports only the helpers it uses
+TESTS = {
+    "receipt": test_receipt_generator,
+    "error": test_error_handler,
+    "validator": test_entity_validator,
+    "integration": test_integration,
+}
 
-def main():
-    """Run all Phase 2 tests"""
-    print("\n" + "=" * 80)
-    print(" " * 20 + "🎯 PHASE 2 COMPREHENSIVE TEST")
-    print(" " * 15 + "Receipt Generator | Error Handler | Entity Validator")
-    print("=" * 80)
+
+def main(only=None):
+    """Run all Phase 2 tests, or just the one named by `only`"""
+    log.info("\n" + SEP)
+    log.info(" " * 20 + "🎯 PHASE 2 COMPREHENSIVE TEST")
+    log.info(" " * 15 + "Receipt Generator | Error Handler | Entity Validator")
+    log.info(SEP)
     
     try:
-        test_receipt_generator()
-        test_error_handler()
-        test_entity_validator()
-        test_integration()
+        if only:
+            TESTS[only]()
+            return True
+        
+        for test in TESTS.values():
+            test()
         
-        print("\n" + "=" * 80)
-        print(" " * 20 + "✅ ALL PHASE 2 TESTS PASSED! 🎉")
-        print("=" * 80)
-        print("\n📊 Test Summary:")
-        print("  ✅ Receipt Generator: All transaction types working")
-        print("  ✅ Error Handler: All error scenarios covered")
-        print("  ✅ Entity Validator: All validation rules working")
-        print("  ✅ Integration: Components working together correctly")
-        print("\n🚀 Phase 2 is ready for end-to-end testing!")
-        print("=" * 80)
+        log.warning("\n" + SEP)
+        log.warning(" " * 20 + "✅ ALL PHASE 2 TESTS PASSED! 🎉")
+        log.warning(SEP)
+        log.warning("\n📊 Test Summary:")
+        log.warning("  ✅ Receipt Generator: All transaction types working")
+        log.warning("  ✅ Error Handler: All error scenarios covered")
+        log.warning("  ✅ Entity Validator: All validation rules working")
+        log.warning("  ✅ Integration: Components working together correctly")
+        log.warning("\n🚀 Phase 2 is ready for end-to-end testing!")
+        log.warning(SEP)
         
     except Exception as e:
-        print(f"\n❌ Test failed with error: {e}")
+        log.error(f"\n❌ Test failed with error: {e}")
         import traceback
         traceback.print_exc()
         return False
@@ -394,5 +471,7 @@ def main():
 
 
 if __name__ == "__main__":
-    success = main()
+    parser = argparse.ArgumentParser(description="Phase 2 component tests")
+    parser.add_argument("--only", choices=TESTS, help="run a single test group")
+    success = main(parser.parse_args().only)
     sys.exit(0 if success else 1)
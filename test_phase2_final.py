@@ -5,14 +5,15 @@ Optimized to prevent server shutdown and handle all edge cases
 """
 
 import requests
-import json
 import time
 import sys
 from typing import Dict, Any, Optional
 
+from _net import API_BASE
+
 class RobustPhase2Tester:
     def __init__(self):
-        self.base_url = "http://localhost:8000"
+        self.base_url = API_BASE
         self.session = requests.Session()
         self.session.headers.update({"Content-Type": "application/json"})
         self.test_results = []
@@ -3,10 +3,13 @@ Redesigned Test Script for Phase 2: Transaction Receipt Generation
 This script focuses solely on testing the receipt generation functionality.
 """
 
-import requests
 import os
 
-BASE_URL = "http://localhost:8000"
+from _http import SESSION
+from _net import API_BASE
+
+BASE_URL = API_BASE
+DOWNLOAD_CHUNK = 64 * 1024
 
 print("\n" + "="*80)
 print(" "*20 + "PHASE 2 RECEIPT TEST")
@@ -22,24 +25,26 @@ try:
         "currency": "USD",
         "recipient": "John Doe"
     }
-    response = requests.post(
+    response = SESSION.post(
         f"{BASE_URL}/api/receipt",
         json=payload,
-        timeout=10
+        timeout=(1, 9)
     )
     if response.status_code == 200:
         data = response.json()
         receipt_url = data.get("receipt_url")
         if receipt_url:
             print(f"   ✅ Receipt generated successfully: {receipt_url}")
-            # Optionally, download the receipt to verify its content
-            receipt_response = requests.get(receipt_url, timeout=10)
-            if receipt_response.status_code == 200:
-                with open("test_receipt.pdf", "wb") as f:
-                    f.write(receipt_response.content)
-                print("   ✅ Receipt downloaded and saved as 'test_receipt.pdf'")
-            else:
-                print(f"   ❌ Failed to download receipt: {receipt_response.status_code}")
+            # Optionally, download the receipt to verify its content,
+            # streamed to disk in chunks rather than held in memory
+            with SESSION.get(receipt_url, stream=True, timeout=(1, 9)) as receipt_response:
+                if receipt_response.status_code == 200:
+                    with open("test_receipt.pdf", "wb") as f:
+                        for chunk in receipt_response.iter_content(DOWNLOAD_CHUNK):
+                            f.write(chunk)
+                    print("   ✅ Receipt downloaded and saved as 'test_receipt.pdf'")
+                else:
+                    print(f"   ❌ Failed to download receipt: {receipt_response.status_code}")
         else:
             print("   ❌ Receipt URL not found in response.")
     else:
@@ -4,10 +4,11 @@ Tests receipt generation, error handling, entity validation
 """
 
 import requests
-import json
 import time
 
-BASE_URL = "http://localhost:8000"
+from _net import API_BASE
+
+BASE_URL = API_BASE
 
 print("\n" + "="*80)
 print(" "*20 + "PHASE 2 END-TO-END TEST")
@@ -4,15 +4,16 @@ Uses proper session management and non-blocking requests
 """
 
 import requests
-import json
 import time
 import threading
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from _net import API_BASE
+
 class StablePhase2Test:
     def __init__(self):
-        self.base_url = "http://127.0.0.1:8000"
+        self.base_url = API_BASE
         self.results = []
         self.session = self._create_session()
     
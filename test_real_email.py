@@ -5,7 +5,9 @@ Test account creation with real email
 import requests
 import time
 
-BASE_URL = "http://localhost:8000/api/chat"
+from _net import API_BASE
+
+BASE_URL = f"{API_BASE}/api/chat"
 SESSION_ID = None
 
 def send_msg(msg):
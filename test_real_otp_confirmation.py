@@ -10,9 +10,23 @@ This test will:
 """
 import requests
 import time
-import json
+import re
 
-BASE_URL = "http://localhost:8000/api/chat"
+try:
+    import pytest
+except ImportError:  # optional: only needed to mark the test when run under pytest
+    pytest = None
+
+from _net import API_BASE
+
+BASE_URL = f"{API_BASE}/api/chat"
+
+# OTP format check, compiled once
+OTP_RE = re.compile(r"\d{6}")
+
+# Reads the OTP from stdin
+if pytest is not None:
+    pytestmark = pytest.mark.interactive
 
 def send_message(message: str, session_id: str = None):
     """Send a message and return response"""
@@ -73,7 +87,7 @@ def test_with_real_otp():
         print("[SKIPPED] Test skipped")
         return
     
-    if not otp_code.isdigit() or len(otp_code) != 6:
+    if not OTP_RE.fullmatch(otp_code):
         print("[ERROR] Invalid OTP format")
         return
     
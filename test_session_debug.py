@@ -3,9 +3,10 @@
 Debug: Check if session state is persisting
 """
 import requests
-import json
 
-BASE_URL = "http://localhost:8000/api/chat"
+from _net import API_BASE
+
+BASE_URL = f"{API_BASE}/api/chat"
 SESSION_ID = None
 
 def send_msg(msg):
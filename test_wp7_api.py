@@ -4,10 +4,11 @@ Tests all API endpoints and integration
 """
 
 import requests
-import json
 import sys
 
-base_url = "http://localhost:8000"
+from _net import API_BASE
+
+base_url = API_BASE
 
 print("=" * 80)
 print(" " * 20 + "FASTAPI BACKEND TEST SUITE - WP7")
@@ -105,8 +106,8 @@ print(f"Total Tests: {tests_passed + tests_failed}")
 if tests_failed == 0:
     print("\n🎉 ALL TESTS PASSED! ✅")
     print("\n   WP7 FastAPI Backend is working successfully!")
-    print("   Server: http://localhost:8000")
-    print("   Docs: http://localhost:8000/docs")
+    print(f"   Server: {base_url}")
+    print(f"   Docs: {base_url}/docs")
     sys.exit(0)
 else:
     print(f"\n❌ {tests_failed} test(s) failed")
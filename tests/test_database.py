@@ -7,9 +7,14 @@ import sys
 import os
 import sqlite3
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Add paths for imports (backend/ first, so `config` is backend/config.py)
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+sys.path.insert(0, os.path.join(project_root, 'backend', 'app'))
+sys.path.insert(0, os.path.join(project_root, 'backend'))
 
 from database.db_manager import DatabaseManager
+from utils.response_generator import ResponseGenerator
 
 
 class DatabaseTester:
@@ -55,6 +60,36 @@ class DatabaseTester:
         self.assert_not_none(user_by_phone, "Get user by phone")
         self.assert_true(user_by_phone['id'] == 1, "User ID matches")
     
+    def test_user_search_index(self):
+        """Test that the users_fts index follows inserts, updates and deletes"""
+        print("\n🔎 Test: User Search Index")
+        print("-" * 70)
+        
+        if not self.db.initialize_users_fts():
+            print("  ⏭️  SQLite lacks FTS5 trigram support; skipped")
+            return
+        
+        def search(query):
+            return [row['name'] for row in self.db.execute_query(
+                "SELECT u.name FROM users u JOIN users_fts ON users_fts.rowid = u.id "
+                "WHERE users_fts MATCH ?", (query,)
+            )]
+        
+        self.assert_true('Sarah Ahmed' in search('name:ahmed'), "Seeded user found by name substring")
+        
+        success, message, user_id = self.db.create_user('Fts Probe', '03009998877', 'probe@fts.test')
+        self.assert_true(success, f"User created: {message}")
+        self.assert_true(search('email:"fts.test"') == ['Fts Probe'], "New user indexed on insert")
+        
+        self.db.execute_update("UPDATE users SET name = 'Renamed Probe' WHERE id = ?", (user_id,))
+        self.assert_true(
+            search('name:renamed') == ['Renamed Probe'] and not search('name:"fts probe"'),
+            "Index updated on rename"
+        )
+        
+        self.db.execute_update("DELETE FROM users WHERE id = ?", (user_id,))
+        self.assert_true(not search('email:"fts.test"'), "Index entry removed on delete")
+    
     def test_account_operations(self):
         """Test account operations"""
         print("\n🏦 Test: Account Operations")
@@ -152,6 +187,94 @@ class DatabaseTester:
         
         self.assert_true(not success, "Transfer rejected for insufficient funds")
     
+    def test_transfer_rollback_in_transaction(self):
+        """Test that a transfer failing inside transaction() leaves no partial writes"""
+        print("\n🔁 Test: Failed Transfer Inside a Transaction")
+        print("-" * 70)
+        
+        from_no = 'PK12ABCD1234567890123456'
+        to_no = 'PK98BANK7654321098765432'
+        from_balance = self.db.get_balance(from_no)
+        to_balance = self.db.get_balance(to_no)
+        
+        # Fail the transfer after both balance updates, on the ledger insert
+        with self.db.get_connection() as conn:
+            txn_count = conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+            conn.execute("""
+                CREATE TRIGGER fail_test_transfer BEFORE INSERT ON transactions
+                WHEN NEW.description = 'Test failing transfer'
+                BEGIN SELECT RAISE(ABORT, 'forced failure'); END
+            """)
+        
+        try:
+            with self.db.transaction():
+                success, message = self.db.execute_transfer(
+                    from_account_no=from_no,
+                    to_account_no=to_no,
+                    amount=1000.00,
+                    description='Test failing transfer'
+                )
+        finally:
+            with self.db.get_connection() as conn:
+                conn.execute("DROP TRIGGER fail_test_transfer")
+        
+        self.assert_true(not success, f"Transfer reported failure: {message}")
+        self.assert_true(
+            self.db.get_balance(from_no) == from_balance,
+            "Source balance unchanged after failed transfer"
+        )
+        self.assert_true(
+            self.db.get_balance(to_no) == to_balance,
+            "Destination balance unchanged after failed transfer"
+        )
+        with self.db.get_connection() as conn:
+            self.assert_true(
+                conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0] == txn_count,
+                "No transaction rows written by failed transfer"
+            )
+    
+    def test_cached_responses_after_writes(self):
+        """Test that cached balance and bills responses are rebuilt after a write"""
+        print("\n🗃️ Test: Cached Responses After Writes")
+        print("-" * 70)
+        
+        generator = ResponseGenerator(self.db)
+        from_no = 'PK12ABCD1234567890123456'
+        to_no = 'PK98BANK7654321098765432'
+        to_user = self.db.get_account_by_number(to_no)['user_id']
+        
+        sender_before = generator.generate_balance_response(1, from_no)
+        recipient_before = generator.generate_balance_response(to_user, to_no)
+        self.assert_true(
+            generator.generate_balance_response(1, from_no) is sender_before,
+            "Repeated balance request served from cache"
+        )
+        
+        success, message = self.db.execute_transfer(from_no, to_no, 250.00, 'Cache test')
+        self.assert_true(success, f"Transfer executed: {message}")
+        
+        sender_after = generator.generate_balance_response(1, from_no)
+        recipient_after = generator.generate_balance_response(to_user, to_no)
+        self.assert_true(
+            sender_after != sender_before and
+            f"{self.db.get_balance(from_no):,.2f}" in sender_after,
+            "Sender sees the new balance right after the transfer"
+        )
+        self.assert_true(
+            recipient_after != recipient_before and
+            f"{self.db.get_balance(to_no):,.2f}" in recipient_after,
+            "Recipient sees the new balance right after the transfer"
+        )
+        
+        bills_before = generator.generate_pending_bills_response(1)
+        bill = self.db.get_bill_by_type(1, 'gas')
+        success, message = self.db.pay_bill(1, 'gas', bill['amount'], from_no)
+        self.assert_true(success, f"Bill paid: {message}")
+        self.assert_true(
+            generator.generate_pending_bills_response(1) != bills_before,
+            "Pending bills rebuilt right after the payment"
+        )
+    
     def test_bill_operations(self):
         """Test bill operations"""
         print("\n🧾 Test: Bill Operations")
@@ -262,9 +385,12 @@ class DatabaseTester:
         
         # Run all tests
         self.test_user_operations()
+        self.test_user_search_index()
         self.test_account_operations()
         self.test_transaction_operations()
         self.test_transfer_operations()
+        self.test_transfer_rollback_in_transaction()
+        self.test_cached_responses_after_writes()
         self.test_bill_operations()
         self.test_card_operations()
         self.test_data_integrity()
@@ -5,11 +5,17 @@ Tests multi-turn conversations, slot filling, and confirmations
 
 import sys
 import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import time
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+# The session manager imports its siblings as top-level packages
+sys.path.append(os.path.join(project_root, 'backend'))
+sys.path.append(os.path.join(project_root, 'backend', 'app'))
 
 from backend.app.ml.dialogue.dialogue_manager import DialogueManager
 from backend.app.ml.dialogue.dialogue_state import DialogueState, ConversationStatus
 from backend.app.ml.dialogue.context_manager import ContextManager
+from backend.app.utils import session_manager
 
 
 class DialogueFlowTester:
@@ -333,6 +339,40 @@ class DialogueFlowTester:
         self.assert_true(state.is_complete(), "All slots filled")
         self.assert_true(len(state.missing_slots) == 0, "No missing slots")
     
+    def test_session_cleanup_wakeups(self):
+        """Test that saves above the high-water mark don't spin the cleanup thread"""
+        print("\n🧹 Test: Session Cleanup Wake-ups")
+        print("-" * 70)
+        
+        count = session_manager.SESSION_HIGH_WATER + 2000
+        for timeout_minutes in (30, 0):
+            sm = session_manager.SessionManager(session_timeout_minutes=timeout_minutes)
+            passes = []
+            cleanup = sm.cleanup_expired_sessions
+            sm.cleanup_expired_sessions = lambda: (passes.append(1), cleanup())
+            # Allow an early pass straight away
+            sm._last_cleanup -= session_manager.EARLY_CLEANUP_MIN_INTERVAL_SECONDS
+            
+            started = time.monotonic()
+            for _ in range(count):
+                session_id = sm.create_session(user_id=1)
+                sm.save_session(session_id, DialogueState(user_id=1, session_id=session_id))
+            elapsed = time.monotonic() - started
+            time.sleep(0.1)  # let a pending wake-up run
+            sm.shutdown(timeout=1)
+            
+            if timeout_minutes:
+                self.assert_true(
+                    not passes,
+                    f"No early passes while {count} sessions are live ({len(passes)})"
+                )
+            else:
+                limit = elapsed // session_manager.EARLY_CLEANUP_MIN_INTERVAL_SECONDS + 1
+                self.assert_true(
+                    1 <= len(passes) <= limit,
+                    f"Expired sessions cleaned by rate-limited early passes ({len(passes)} <= {limit:.0f})"
+                )
+    
     def run_all_tests(self):
         """Run all test suites"""
         print("=" * 70)
@@ -349,6 +389,7 @@ class DialogueFlowTester:
         self.test_confirmation_no()
         self.test_low_confidence_handling()
         self.test_slot_filling_order()
+        self.test_session_cleanup_wakeups()
         
         # Print summary
         print("\n" + "=" * 70)